@@ -0,0 +1,150 @@
+"""
+Headless stand-in for the parts of gi.repository.IBus and GLib that
+platforms/linux/ibus_engine.py touches, so AdorLipiEngine can be driven
+without an IBus daemon or a display server.
+
+install() registers fake `gi` modules; import ibus_engine after it. The
+stub Engine records what the real one would send to IBus (preedit,
+lookup table, committed text) on plain attributes.
+"""
+import sys
+import types
+
+
+class ModifierType:
+    CONTROL_MASK = 1 << 2
+    MOD1_MASK = 1 << 3
+    RELEASE_MASK = 1 << 30
+
+
+class AttrType:
+    UNDERLINE = 1
+
+
+class AttrUnderline:
+    SINGLE = 1
+
+
+class Text:
+    def __init__(self, text):
+        self.text = text
+        self.attributes = None
+
+    @classmethod
+    def new_from_string(cls, text):
+        return cls(text)
+
+    def get_text(self):
+        return self.text
+
+    def set_attributes(self, attributes):
+        self.attributes = attributes
+
+
+class Attribute:
+    @staticmethod
+    def new(kind, value, start, end):
+        return (kind, value, start, end)
+
+
+class AttrList(list):
+    pass
+
+
+class LookupTable:
+    def __init__(self, page_size):
+        self.page_size = page_size
+        self.candidates = []
+        self.cursor = 0
+
+    @classmethod
+    def new(cls, page_size, cursor_pos, cursor_visible, round_):
+        return cls(page_size)
+
+    def clear(self):
+        self.candidates = []
+        self.cursor = 0
+
+    def append_candidate(self, text):
+        self.candidates.append(text)
+
+    def get_number_of_candidates(self):
+        return len(self.candidates)
+
+    def get_cursor_pos(self):
+        return self.cursor
+
+    def cursor_down(self):
+        if self.cursor + 1 < len(self.candidates):
+            self.cursor += 1
+
+    def cursor_up(self):
+        if self.cursor > 0:
+            self.cursor -= 1
+
+
+class Engine:
+    """Records the engine's output instead of sending it to IBus."""
+    def __init__(self):
+        self.preedit = ""
+        self.candidates = []
+        self.committed = []
+
+    def update_preedit_text(self, text, cursor_pos, visible):
+        self.preedit = text.get_text()
+
+    def hide_preedit_text(self):
+        self.preedit = ""
+
+    def update_lookup_table(self, table, visible):
+        self.candidates = [t.get_text() for t in table.candidates]
+
+    def hide_lookup_table(self):
+        self.candidates = []
+
+    def commit_text(self, text):
+        self.committed.append(text.get_text())
+
+
+class Service:
+    def __init__(self):
+        pass
+
+
+# Key symbols (X11 keysym values)
+KEYS = {
+    'BackSpace': 0xff08,
+    'Return': 0xff0d,
+    'KP_Enter': 0xff8d,
+    'Up': 0xff52,
+    'Down': 0xff54,
+    'space': 0x20,
+}
+KEYS.update({f'KEY_{n}': 0x30 + n for n in range(10)})
+
+
+def install():
+    """Registers the stub as `gi` / `gi.repository.IBus` / `gi.repository.GLib`."""
+    ibus = types.ModuleType('gi.repository.IBus')
+    for cls in (ModifierType, AttrType, AttrUnderline, Text, Attribute, AttrList,
+                LookupTable, Engine, Service):
+        setattr(ibus, cls.__name__, cls)
+    for name, keyval in KEYS.items():
+        setattr(ibus, name, keyval)
+
+    glib = types.ModuleType('gi.repository.GLib')
+    repository = types.ModuleType('gi.repository')
+    repository.IBus = ibus
+    repository.GLib = glib
+
+    gi = types.ModuleType('gi')
+    gi.require_version = lambda namespace, version: None
+    gi.repository = repository
+
+    sys.modules.update({
+        'gi': gi,
+        'gi.repository': repository,
+        'gi.repository.IBus': ibus,
+        'gi.repository.GLib': glib,
+    })
+    return ibus
@@ -0,0 +1,238 @@
+"""
+Keystroke-replay benchmark for the IBus engine.
+
+Replays recorded typing (benchmarks/recordings/*.keys) through
+AdorLipiEngine.do_process_key_event, which covers the _update path
+(transliterate the buffer, suggestions, candidate list) and the _commit
+path. IBus is replaced by benchmarks/ibus_stub.py, so no IBus daemon or
+display server is needed. Learned words go to a throwaway HOME.
+
+Reports p50/p95/p99 per-keystroke latency by key kind, the words with the
+slowest keystrokes, and, with --compare, regressions against a stored
+baseline (exit status 1 when a percentile got slower than the tolerance).
+
+Usage: python3 benchmarks/keystrokes.py [recordings...] [--passes N]
+           [--save-baseline | --compare] [--baseline PATH] [--tolerance 0.25]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Add project root to path (benchmarks/ -> root)
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(benchmarks_dir)
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'platforms', 'linux'))
+
+import ibus_stub
+
+RECORDINGS = os.path.join(benchmarks_dir, 'recordings', '*.keys')
+DEFAULT_BASELINE = os.path.join(benchmarks_dir, 'keystrokes_baseline.json')
+PERCENTILES = (50, 95, 99)
+KINDS = ('char', 'backspace', 'commit', 'navigate')
+
+_KEY_TOKEN = re.compile(r'<(BS|CR|Up|Down|[1-9])>|(.)', re.S)
+
+
+def load_engine_class():
+    """Imports AdorLipiEngine against the IBus stub."""
+    ibus_stub.install()
+    # ibus_engine logs every key at DEBUG to /tmp; keep that I/O out of
+    # the measurement (basicConfig in the module is then a no-op)
+    logging.basicConfig(handlers=[logging.NullHandler()], level=logging.WARNING)
+    import ibus_engine
+    return ibus_engine.AdorLipiEngine
+
+
+def parse_recording(path):
+    """Returns one list of (label, keyval) key presses per typing run."""
+    ibus = sys.modules['gi.repository.IBus']
+    special = {
+        'BS': ibus.BackSpace,
+        'CR': ibus.Return,
+        'Up': ibus.Up,
+        'Down': ibus.Down,
+    }
+    runs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            keys = []
+            for m in _KEY_TOKEN.finditer(line):
+                name, char = m.groups()
+                if char is not None:
+                    keys.append((char, ord(char)))
+                elif name.isdigit():
+                    keys.append((f'<{name}>', getattr(ibus, f'KEY_{name}')))
+                else:
+                    keys.append((f'<{name}>', special[name]))
+            keys.append(('<CR>', ibus.Return))
+            runs.append(keys)
+    return runs
+
+
+def key_kind(label, engine):
+    """Classifies a key press by the engine path it takes."""
+    if label == '<BS>':
+        return 'backspace'
+    if label in ('<Up>', '<Down>'):
+        return 'navigate'
+    if label in (' ', '<CR>') or (label.startswith('<') and engine.buffer):
+        return 'commit'
+    return 'char'
+
+
+def replay(engine, runs, latencies, words):
+    """
+    Presses every key of `runs`, appending each key's latency (seconds) to
+    latencies[kind] and, per committed word, its slowest key to `words`.
+    """
+    for keys in runs:
+        slowest = 0.0
+        for label, keyval in keys:
+            kind = key_kind(label, engine)
+            typed = engine.buffer
+            start = time.perf_counter()
+            engine.do_process_key_event(keyval, 0, 0)
+            elapsed = time.perf_counter() - start
+            latencies[kind].append(elapsed)
+            slowest = max(slowest, elapsed)
+            if kind == 'commit':
+                if typed:
+                    words.append((slowest, typed, label))
+                slowest = 0.0
+        # Like switching windows between runs
+        engine.do_focus_out()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies):
+    """{kind: {'keys': n, 'p50_ms': ..., ...}} including an 'all' row."""
+    rows = dict(latencies)
+    rows['all'] = [t for kind in KINDS for t in latencies[kind]]
+    summary = {}
+    for kind, values in rows.items():
+        if not values:
+            continue
+        values = sorted(values)
+        row = {'keys': len(values)}
+        for p in PERCENTILES:
+            row[f'p{p}_ms'] = percentile(values, p) * 1000
+        row['max_ms'] = values[-1] * 1000
+        summary[kind] = row
+    return summary
+
+
+def compare(summary, baseline, tolerance):
+    """Lines describing percentiles slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for kind, row in summary.items():
+        base = baseline.get(kind)
+        if not base:
+            continue
+        for p in PERCENTILES:
+            key = f'p{p}_ms'
+            old, new = base.get(key), row[key]
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{kind} {key}: {old:.3f} -> {new:.3f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay recorded keystrokes through the IBus engine logic.")
+    parser.add_argument('recordings', nargs='*', help="Recording files (default: benchmarks/recordings/*.keys)")
+    parser.add_argument('--passes', type=int, default=3,
+                        help="Replays of the recordings on one engine; later passes see a warm cache (default: 3)")
+    parser.add_argument('--worst', type=int, default=10, help="Slowest words to list (default: 10)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON path")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    mode.add_argument('--compare', action='store_true', help="Fail on regressions against the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown per percentile before it counts as a regression (default: 0.25)")
+    return parser.parse_args()
+
+
+def run(args, paths):
+    """Replays the recordings, prints the report and returns the exit status."""
+    engine_class = load_engine_class()
+    runs = [keys for path in paths for keys in parse_recording(path)]
+
+    start = time.perf_counter()
+    engine = engine_class()
+    print(f"Engine ready in {(time.perf_counter() - start) * 1000:.0f} ms; "
+          f"{sum(len(k) for k in runs)} keys in {len(runs)} runs x {args.passes} passes")
+
+    latencies = {kind: [] for kind in KINDS}
+    words = []
+    for _ in range(args.passes):
+        replay(engine, runs, latencies, words)
+
+    # Write out what the session learned now: the exit-time flushes would
+    # find the temporary home already removed
+    transliterator = engine.transliterator
+    transliterator.user_dictionary.flush()
+    transliterator.context_engine.store.flush()
+
+    summary = summarize(latencies)
+    print(f"\n{'kind':<10}{'keys':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for kind, row in summary.items():
+        print(f"{kind:<10}{row['keys']:>8}{row['p50_ms']:>9.3f}{row['p95_ms']:>9.3f}"
+              f"{row['p99_ms']:>9.3f}{row['max_ms']:>9.3f}")
+
+    print(f"\nSlowest words (slowest keystroke while typing or committing):")
+    for elapsed, word, commit_key in sorted(words, reverse=True)[:args.worst]:
+        print(f"  {elapsed * 1000:8.3f} ms  {word!r} (committed with {commit_key!r})")
+
+    status = 0
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 2
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(summary, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return status
+
+
+def main():
+    args = parse_args()
+    paths = args.recordings or sorted(glob.glob(RECORDINGS))
+
+    # Keep learned selections out of the real user dictionary
+    home = tempfile.TemporaryDirectory()
+    os.environ['HOME'] = home.name
+    try:
+        return run(args, paths)
+    finally:
+        home.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
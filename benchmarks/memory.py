@@ -0,0 +1,76 @@
+"""
+Memory benchmark for the suggestion word pool.
+
+Compares the memory retained by the compact representation Suggester
+uses (one UTF-8 blob, u32 offsets, u16 frequencies, ranking keys) with
+the plain list-of-str pool and str -> int frequency dict it replaced.
+Both are built from the JSON files, so no compiled artifact is needed.
+
+Usage: python3 benchmarks/memory.py
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to path (benchmarks/ -> root)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from core.engine.suggester import Suggester
+
+DATA_DIR = os.path.join(project_root, 'data')
+
+
+def build_plain():
+    """The previous layout: deduplicated list of str plus a frequency dict."""
+    with open(os.path.join(DATA_DIR, 'openbangla_dictionary.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    word_pool = []
+    seen = set()
+    for arr in data.values():
+        for w in arr:
+            if w not in seen:
+                word_pool.append(w)
+                seen.add(w)
+    with open(os.path.join(DATA_DIR, 'word_frequency.json'), 'r', encoding='utf-8') as f:
+        word_freq = json.load(f)
+    return word_pool, word_freq
+
+
+def build_compact():
+    return Suggester(os.path.join(DATA_DIR, 'openbangla_dictionary.json'))
+
+
+def measure(builder):
+    """Returns (retained bytes, peak bytes, seconds) for building one instance."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = builder()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return retained, peak, elapsed
+
+
+def main():
+    rows = [
+        ("plain list + dict", measure(build_plain)),
+        ("compact Suggester", measure(build_compact)),
+    ]
+    mb = 1024 * 1024
+    print(f"{'layout':<20} {'retained':>10} {'peak':>10} {'build':>8}")
+    for name, (retained, peak, elapsed) in rows:
+        print(f"{name:<20} {retained / mb:>8.1f}MB {peak / mb:>8.1f}MB {elapsed:>7.2f}s")
+
+    plain, compact = rows[0][1][0], rows[1][1][0]
+    print(f"Retained memory reduced by {(1 - compact / plain) * 100:.0f}% ({plain / compact:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
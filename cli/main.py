@@ -1,5 +1,9 @@
 import sys
 import os
+import time
+import argparse
+from array import array
+from collections import deque
 
 # Add project root to path (cli/ -> root)
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -7,15 +11,95 @@ sys.path.insert(0, project_root)
 
 from core.engine.transliterator import Transliterator
 
-def main():
-    print("Initializing AdorLipi Engine...")
-    try:
-        engine = Transliterator()
-        print("AdorLipi Ready! Type 'exit' to quit.")
-        print("-" * 30)
-    except Exception as e:
-        print(f"Failed to initialize engine: {e}")
-        return
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="AdorLipi Banglish to Bangla transliterator. "
+                    "Interactive when run on a terminal with no files; "
+                    "otherwise streams files (or stdin) line by line to stdout.")
+    parser.add_argument('files', nargs='*', help="Input files; '-' reads stdin")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Worker processes for streaming mode (default: 1)")
+    parser.add_argument('-s', '--suggestions', action='store_true',
+                        help="Append a tab-separated column of suggestions for each line's last word")
+    return parser.parse_args()
+
+def read_lines(paths, stats, chunk):
+    """
+    Yields input lines without their newline, counting lines and bytes
+    and noting when the first line of each `chunk` lines was read. Exits
+    with a message on an unreadable or non-UTF-8 file.
+    """
+    for path in paths or ['-']:
+        name = '<stdin>' if path == '-' else path
+        try:
+            f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+        except OSError as e:
+            sys.exit(f"{name}: {e.strerror}")
+        try:
+            for line in f:
+                if stats['lines'] % chunk == 0:
+                    stats['chunk_starts'].append(time.perf_counter())
+                stats['lines'] += 1
+                stats['bytes'] += len(line.encode('utf-8'))
+                yield line[:-1] if line.endswith('\n') else line
+        except (OSError, UnicodeDecodeError) as e:
+            sys.exit(f"{name}: {e}")
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def stream(engine, args):
+    """
+    Non-interactive mode: transliterates every input line and writes it out
+    as soon as its chunk is done. Memory stays flat for any input size.
+    """
+    # Pipes default to the locale encoding; AdorLipi text is always UTF-8
+    sys.stdin.reconfigure(encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    chunk = engine.BATCH_CHUNK
+    stats = {'lines': 0, 'bytes': 0, 'chunk_starts': deque()}
+    # Per chunk, from reading its first line to writing its last output
+    latencies = array('d')
+    start = time.perf_counter()
+
+    # The batch API yields results in order and reads input lazily; with
+    # --jobs the suggestions are computed in the workers as well.
+    lines = read_lines(args.files, stats, chunk)
+    out = sys.stdout
+    written = 0
+    for result in engine.transliterate_many(lines, jobs=args.jobs, suggestions=args.suggestions):
+        if args.suggestions:
+            output, suggestions = result
+            result = output + '\t' + ', '.join(suggestions)
+        out.write(result + '\n')
+        written += 1
+        if written % chunk == 0:
+            latencies.append(time.perf_counter() - stats['chunk_starts'].popleft())
+    out.flush()
+    if stats['chunk_starts']:  # The last, partial chunk
+        latencies.append(time.perf_counter() - stats['chunk_starts'].popleft())
+
+    elapsed = time.perf_counter() - start
+    n = stats['lines']
+    rate = n / elapsed if elapsed else 0.0
+    mb = stats['bytes'] / 1e6
+    latencies = sorted(latencies)
+    print(f"{n} lines, {mb:.2f} MB in {elapsed:.2f}s "
+          f"(throughput {rate:.0f} lines/s, {mb / elapsed if elapsed else 0.0:.2f} MB/s; "
+          f"latency per {chunk}-line chunk p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.0f} ms; jobs={args.jobs})", file=sys.stderr)
+
+def interactive(engine):
+    print("AdorLipi Ready! Type 'exit' to quit.")
+    print("-" * 30)
 
     while True:
         try:
@@ -23,22 +107,43 @@ def main():
             if user_input.strip().lower() in ['exit', 'quit']:
                 print("Exiting...")
                 break
-            
+
             if not user_input.strip():
                 continue
-                
+
             output = engine.transliterate(user_input)
             print(f"\nOutput:\n{output}")
-            
+
             suggestions = engine.get_suggestions(user_input)
             if suggestions:
                 print(f"Suggestions: {', '.join(suggestions)}")
-            
+
         except KeyboardInterrupt:
             print("\nExiting...")
             break
         except Exception as e:
             print(f"Error: {e}")
 
+def main():
+    args = parse_args()
+    streaming = bool(args.files) or not sys.stdin.isatty()
+
+    # Keep stdout clean for piped output
+    log = sys.stderr if streaming else sys.stdout
+    print("Initializing AdorLipi Engine...", file=log)
+    try:
+        engine = Transliterator()
+    except Exception as e:
+        print(f"Failed to initialize engine: {e}", file=log)
+        sys.exit(1)
+
+    if streaming:
+        try:
+            stream(engine, args)
+        except KeyboardInterrupt:
+            sys.exit(130)
+    else:
+        interactive(engine)
+
 if __name__ == "__main__":
     main()
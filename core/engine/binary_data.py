@@ -0,0 +1,345 @@
+"""
+Compiled binary data artifact for AdorLipi (data/adorlipi.bin).
+
+The JSON data files are compiled by tools/build_data.py into a single
+file that is memory-mapped at startup and queried in place, so engine
+startup does not parse or copy megabytes of JSON.
+
+Layout (native byte order, recorded in the meta section):
+    header    : magic b'ADLP', u32 format version, u32 section count
+    directory : section count x (24-byte name, u64 offset, u64 length)
+    payload   : sections, each aligned to 8 bytes
+
+String lists are stored as a '<name>.str' UTF-8 blob plus a '<name>.off'
+u32 offset table with one extra trailing entry. Sorted lists are sorted
+by code point, which is also UTF-8 byte order.
+"""
+import bisect
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b'ADLP'
+FORMAT_VERSION = 3
+ARTIFACT_NAME = 'adorlipi.bin'
+
+# JSON files compiled into the artifact; their size, mtime and CRC-32 are
+# recorded so a stale artifact (source edited, artifact not rebuilt) is
+# ignored.
+SOURCES = ('openbangla_dictionary.json', 'word_frequency.json', 'dictionary.json', 'mapping.json')
+
+_HEADER = struct.Struct('<4sII')
+_ENTRY = struct.Struct('<24sQQ')
+
+
+class StringTable:
+    """
+    Read-only sequence of str stored as one UTF-8 blob plus an offset table.
+    Used for both the memory-mapped artifact and the in-memory JSON fallback,
+    in place of a list of Python str objects.
+    """
+    def __init__(self, blob, offsets, base=0):
+        self.blob = blob        # bytes or mmap; slicing either yields bytes
+        self.offsets = offsets  # len(self) + 1 offsets into blob, from `base`
+        self.base = base
+        self.raw = _RawStrings(blob, offsets, base)
+
+    @classmethod
+    def from_strings(cls, strings):
+        strings = list(strings)
+        # Each string encoded again for its length, one at a time
+        offsets = array('I', list(itertools.accumulate(map(len, map(str.encode, strings)), initial=0)))
+        return cls(''.join(strings).encode('utf-8'), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.raw[i], 'utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class _RawStrings:
+    """
+    The same strings as undecoded UTF-8 bytes, for binary searches.
+    Indexing is non-negative only; this sits on the bisect hot path.
+    """
+    def __init__(self, blob, offsets, base):
+        self.blob = blob
+        self.offsets = offsets
+        self.base = base
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        base = self.base
+        return self.blob[base + self.offsets[i]:base + self.offsets[i + 1]]
+
+
+class Groups:
+    """
+    Read-only sequence of lists stored flat: group i is
+    [items[j] for j in ids[starts[i]:starts[i + 1]]].
+    """
+    def __init__(self, items, ids, starts):
+        self.items = items
+        self.ids = ids
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __getitem__(self, i):
+        items = self.items
+        return [items[j] for j in self.ids[self.starts[i]:self.starts[i + 1]]]
+
+
+class StringMap:
+    """
+    Read-only dict-like view over a sorted key table and a parallel value
+    sequence. Lookups are a binary search over the keys.
+    """
+    def __init__(self, keys, values):
+        self._keys = keys
+        self._values = values
+
+    def index(self, key):
+        """Position of `key` in the sorted key table, or -1."""
+        raw = key.encode('utf-8')
+        keys = self._keys.raw
+        i = bisect.bisect_left(keys, raw)
+        if i < len(keys) and keys[i] == raw:
+            return i
+        return -1
+
+    def get(self, key, default=None):
+        i = self.index(key)
+        return self._values[i] if i >= 0 else default
+
+    def __getitem__(self, key):
+        i = self.index(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._values[i]
+
+    def __contains__(self, key):
+        return self.index(key) >= 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._keys, self._values)
+
+
+class DataArtifact:
+    """A memory-mapped, read-only view of a compiled data artifact."""
+    def __init__(self, mm, sections):
+        self.mm = mm
+        self.buf = memoryview(mm)
+        self.sections = sections
+        self.meta = json.loads(str(self.section('meta'), 'utf-8'))
+
+    @classmethod
+    def open(cls, path, data_dir=None, version=FORMAT_VERSION):
+        """
+        Maps the artifact at `path`. Returns None if it is missing, corrupt,
+        was built by another format version or byte order, or is older than
+        the JSON sources next to it; callers then fall back to the JSON files.
+        Other files in this layout pass their own `version`.
+        """
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, file_version, count = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or file_version != version:
+                return None
+
+            sections = {}
+            for n in range(count):
+                name, offset, length = _ENTRY.unpack_from(mm, _HEADER.size + n * _ENTRY.size)
+                if offset + length > len(mm):
+                    return None
+                sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+
+            artifact = cls(mm, sections)
+        except (struct.error, KeyError, ValueError):
+            # Truncated or corrupt: a short header or directory, no meta
+            # section, or a meta block that isn't JSON
+            return None
+        if not isinstance(artifact.meta, dict) or artifact.meta.get('byteorder') != sys.byteorder:
+            return None
+        if data_dir is not None and artifact.is_stale(data_dir):
+            # stderr: streaming CLI output goes to stdout
+            print(f"Warning: {path} is out of date, loading JSON data instead", file=sys.stderr)
+            return None
+        return artifact
+
+    def is_stale(self, data_dir):
+        """
+        True if a source in `data_dir` differs from the one compiled in.
+        A source whose size and mtime match is taken as unchanged; one
+        whose mtime moved (a checkout, a copy) is compared by CRC-32, so
+        only an edit makes the artifact stale.
+        """
+        for name, recorded in self.meta.get('sources', {}).items():
+            path = os.path.join(data_dir, name)
+            if not os.path.exists(path):
+                continue
+            if not isinstance(recorded, dict):
+                return True  # Built before mtimes and checksums were recorded
+            stat = os.stat(path)
+            if stat.st_size != recorded.get('size'):
+                return True
+            if stat.st_mtime_ns != recorded.get('mtime_ns') and _crc32(path) != recorded.get('crc32'):
+                return True
+        return False
+
+    def section(self, name):
+        offset, length = self.sections[name]
+        return self.buf[offset:offset + length]
+
+    def array(self, name, typecode):
+        return self.section(name).cast(typecode)
+
+    def strings(self, name):
+        offset, _ = self.sections[name + '.str']
+        return StringTable(self.mm, self.array(name + '.off', 'I'), offset)
+
+    def json(self, name):
+        return json.loads(str(self.section(name), 'utf-8'))
+
+
+class ArtifactWriter:
+    """Collects named sections and writes them out in the artifact layout."""
+    def __init__(self, version=FORMAT_VERSION):
+        self.version = version
+        self.sections = []
+
+    def add(self, name, data):
+        self.sections.append((name, bytes(data)))
+
+    def add_array(self, name, typecode, values):
+        self.add(name, array(typecode, values).tobytes())
+
+    def add_strings(self, name, strings):
+        if not (isinstance(strings, StringTable) and isinstance(strings.blob, bytes)):
+            strings = StringTable.from_strings(strings)
+        self.add(name + '.str', strings.blob)
+        self.add(name + '.off', strings.offsets.tobytes())
+
+    def add_json(self, name, obj):
+        self.add(name, json.dumps(obj, ensure_ascii=False).encode('utf-8'))
+
+    def write(self, path):
+        offset = _HEADER.size + len(self.sections) * _ENTRY.size
+        directory = []
+        for name, data in self.sections:
+            offset = (offset + 7) & ~7
+            directory.append((name, offset, len(data)))
+            offset += len(data)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, self.version, len(self.sections)))
+            for name, off, length in directory:
+                f.write(_ENTRY.pack(name.encode('ascii'), off, length))
+            for (name, data), (_, off, _) in zip(self.sections, directory):
+                f.write(b'\0' * (off - f.tell()))
+                f.write(data)
+        os.replace(tmp_path, path)
+
+
+def _crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _source_record(path):
+    """What is_stale() compares a source file against."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'crc32': _crc32(path)}
+
+
+def compile_data(data_dir, out_path=None):
+    """
+    Compiles the JSON data files in `data_dir` into a binary artifact.
+    The engine components build their indexes from JSON exactly as they do
+    at runtime, and those indexes are what gets written out.
+    Returns the path of the written artifact.
+    """
+    from .dictionary import Dictionary
+    from .suggester import Suggester
+
+    if out_path is None:
+        out_path = os.path.join(data_dir, ARTIFACT_NAME)
+
+    writer = ArtifactWriter()
+    writer.add_json('meta', {
+        'byteorder': sys.byteorder,
+        'sources': {name: _source_record(os.path.join(data_dir, name))
+                    for name in SOURCES if os.path.exists(os.path.join(data_dir, name))},
+    })
+
+    # Suggestion pool: sorted words, pool positions, ranking keys, frequencies
+    suggester = Suggester(os.path.join(data_dir, 'openbangla_dictionary.json'))
+    index = suggester.prefix_index
+    writer.add_strings('pool', index.words)
+    writer.add_array('pool.pos', 'I', index.positions)
+    writer.add_array('pool.key', 'q', index.keys)
+    writer.add_array('pool.frq', 'H', suggester.word_freq.values())
+
+    # Core dictionary and its skeleton index, both sorted by key
+    dictionary = Dictionary(os.path.join(data_dir, 'dictionary.json'))
+    keys = sorted(dictionary.dictionary)
+    writer.add_strings('dict.keys', keys)
+    writer.add_strings('dict.values', [dictionary.dictionary[k] for k in keys])
+    # Skeleton index: each skeleton's ranked keys as ids into dict.keys
+    key_ids = {k: i for i, k in enumerate(keys)}
+    skeletons = sorted(dictionary.skeleton_index)
+    ids, starts = [], [0]
+    for sk in skeletons:
+        ids.extend(key_ids[k] for k in dictionary.skeleton_index[sk])
+        starts.append(len(ids))
+    writer.add_strings('skel.keys', skeletons)
+    writer.add_array('skel.ids', 'I', ids)
+    writer.add_array('skel.start', 'I', starts)
+
+    # Fuzzy deletion index and its Bloom filter, keyed by position in dict.keys
+    fuzzy = dictionary.fuzzy_index
+    writer.add_array('fuzzy.hash', 'I', fuzzy.hashes)
+    writer.add_array('fuzzy.ids', 'I', fuzzy.ids)
+    writer.add('fuzzy.bloom', fuzzy.bloom.bits)
+
+    mapping_path = os.path.join(data_dir, 'mapping.json')
+    if os.path.exists(mapping_path):
+        with open(mapping_path, 'r', encoding='utf-8') as f:
+            writer.add_json('mapping', json.load(f))
+
+    writer.write(out_path)
+    return out_path
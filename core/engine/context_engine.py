@@ -1,18 +1,185 @@
 """
 N-Gram Context Engine for AdorLipi.
 
-Tracks the previous word and uses Bengali bigram pairs to disambiguate
-the current word. For example, if the previous word is 'নদীর', then
-'ধারে' should be boosted over 'দারে'.
+Tracks the last two committed words and ranks the next word by its
+probability after them: learned from the user's own writing (NgramModel)
+and seeded with corpus statistics (CorpusBigrams, built by
+tools/build_bigrams.py) or, without a corpus model, hand-written Bengali
+bigram pairs. For example, if the previous word is 'নদীর', then 'ধারে'
+should be boosted over 'দারে'.
 """
+import os
+import json
+import threading
+import time
+from .ngram_model import NgramModel
+from .corpus_bigrams import CorpusBigrams
+from .persistence import BackgroundWriter, append_journal, config_dir, file_lock, write_atomic
+
+class ContextStore:
+    """
+    The user's learned n-gram model with its files, and the corpus model:
+    everything ContextEngine ranks with except the context itself, so one
+    store serves every input context of a process.
+
+    The learned counts are persisted like the user dictionary: learn()
+    queues [time, prev_prev, prev, word] events that a background writer
+    appends to context.journal, and once the journal grows past
+    COMPACT_BYTES it is folded into the binary snapshot context.model.
+    Compaction starts from the files, not from memory, so events other
+    processes appended are kept; all file access holds context.lock.
+
+    Compaction is also how the in-memory model gets merged and pruned:
+    once it holds NgramModel.MERGE_AFTER unmerged pairs the writer
+    compacts, and the compacted model (plus events learned meanwhile)
+    replaces it. learn() itself only counts.
+    """
+    # Seconds the writer waits after a learn so a burst is one append
+    FLUSH_DELAY = 2.0
+
+    # Journal size that triggers compaction into the snapshot
+    COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, state_dir=None):
+        # Opened on first use; see set_corpus_model()
+        self.corpus_path = None
+        self._corpus = None
+        self._corpus_opened = False
+
+        directory = state_dir or config_dir()
+        self.model_path = os.path.join(directory, 'context.model')
+        self.journal_path = os.path.join(directory, 'context.journal')
+        self.lock_path = os.path.join(directory, 'context.lock')
+        self._lock = threading.Lock()  # pending events
+        self._write_lock = threading.Lock()  # the files, within this process
+        self._writer = BackgroundWriter(self.flush, self.FLUSH_DELAY, 'adorlipi-context')
+        self._pending = []
+
+        try:
+            with file_lock(self.lock_path, shared=True):
+                self.model = NgramModel.load(self.model_path)
+                self._replay(self.model)
+        except OSError:
+            self.model = NgramModel()
+
+    def set_corpus_model(self, path):
+        """
+        Uses the corpus bigram model at `path` (if it exists) from the next
+        context on. The file is only opened when first needed.
+        """
+        self.corpus_path = path
+        self._corpus = None
+        self._corpus_opened = False
+
+    def corpus_model(self):
+        """The CorpusBigrams in use, or None."""
+        if not self._corpus_opened:
+            self._corpus_opened = True
+            if self.corpus_path:
+                self._corpus = CorpusBigrams.open(self.corpus_path)
+        return self._corpus
+
+    def _replay(self, model):
+        """Applies the journal's events to `model`."""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        for line in data.splitlines():
+            try:
+                t, prev_prev, prev, word = json.loads(line)
+            except ValueError:
+                continue  # Left over from a write cut short by a crash
+            model.observe(prev_prev, prev, word, t)
+
+    def learn(self, prev_prev, prev, word):
+        """
+        Counts `word` after `prev_prev prev`. Saved in the background
+        shortly after (see flush()).
+        """
+        now = time.time()
+        with self._lock:
+            self.model.observe(prev_prev, prev, word, now)
+            self._pending.append([round(now, 1), prev_prev, prev, word])
+        self._writer.notify()
+
+    def flush(self):
+        """
+        Appends the queued events to the journal, compacting it once it
+        reaches COMPACT_BYTES or the model needs a merge. Called by the
+        background writer and at exit.
+        """
+        if not self._pending:
+            return
+        try:
+            with self._write_lock, file_lock(self.lock_path):
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                data = ''.join([json.dumps(e, ensure_ascii=False) + '\n' for e in pending]).encode('utf-8')
+                _, size = append_journal(self.journal_path, data)
+                if size >= self.COMPACT_BYTES or self.model.unmerged() >= NgramModel.MERGE_AFTER:
+                    self._compact_locked()
+        except Exception as e:
+            print(f"Warning: Failed to save context model: {e}")
+
+    def _compact_locked(self):
+        """
+        Folds the journal into a new snapshot (file lock held). Built from
+        the files, which hold every process's events, not from this
+        process's model; the merged result then replaces that model.
+        """
+        model = NgramModel.load(self.model_path)
+        self._replay(model)
+        write_atomic(self.model_path, model.save())
+        write_atomic(self.journal_path, b'')
+        with self._lock:
+            # Learned since flush() took the queue: not in the files yet
+            for t, prev_prev, prev, word in self._pending:
+                model.observe(prev_prev, prev, word, t)
+            self.model = model
+
 
 class ContextEngine:
-    def __init__(self):
+    """
+    The context of one input field: its last two committed words and the
+    boosts they give the next word. The model it ranks with lives in a
+    ContextStore, shared between engines when one is passed in.
+    """
+    # Pseudo-count of each hand-written bigram, so they rank until the
+    # user's own counts outweigh them
+    PRIOR_COUNT = 2.0
+
+    # Pseudo-counts a corpus model spreads over a word's next words, in
+    # proportion to their corpus probability
+    CORPUS_PRIOR = 10.0
+
+    # Ranking points per unit of next-word probability, and their cap.
+    # Suggester frequency scores run from 10 to 140; a hand-written bigram
+    # among five alternatives gets about 50.
+    BOOST_SCALE = 400
+    MAX_BOOST = 80
+
+    # Most next words boosted after one context
+    MAX_BOOSTED = 48
+
+    def __init__(self, store=None):
+        self.prev_prev_word = None
         self.prev_word = None
+        self.store = store if store is not None else ContextStore()
+
+        # Computed once per context change: word -> boost of the boosted
+        # words, best first, and their distinct lengths for prefix lookups
+        self.boosts = {}
+        self.boosted = []
+        self.boosted_lengths = ()
+        # Changes whenever the boost set does, so callers can cache
+        self.version = 0
         
         # Bengali bigram pairs: (prev_word_prefix, current_word)
         # If the previous committed word STARTS WITH the prefix,
-        # the current_word gets a boost in suggestions.
+        # the current_word gets prior counts after it. Not used when
+        # a corpus model is available.
         # Format: { 'prev_prefix': ['boosted_word1', 'boosted_word2'] }
         self.bigrams = {
             # Nature collocations
@@ -67,41 +234,93 @@ class ContextEngine:
             'সেই': ['দিন', 'রাত', 'মানুষ', 'সময়', 'কথা'],
         }
 
+    @property
+    def model(self):
+        return self.store.model
+
+    def set_corpus_model(self, path):
+        """See ContextStore.set_corpus_model()."""
+        self.store.set_corpus_model(path)
+
+    def learn(self, committed_bangla_word):
+        """
+        Counts a committed word after the current context, then makes it
+        the context.
+        """
+        word = committed_bangla_word.strip() if committed_bangla_word else ''
+        if not word:
+            return
+        self.store.learn(self.prev_prev_word, self.prev_word, word)
+        self.set_context(word)
+
     def set_context(self, committed_bangla_word):
-        """Called after each word is committed to track context."""
+        """Makes a committed word the context, without learning from it."""
         if committed_bangla_word:
+            self.prev_prev_word = self.prev_word
             self.prev_word = committed_bangla_word.strip()
+            self._index_boosts()
 
     def clear_context(self):
         """Called when the user resets or starts a new sentence."""
+        self.prev_prev_word = None
         self.prev_word = None
+        self._index_boosts()
 
-    def get_boosted_words(self):
+    def _index_boosts(self):
         """
-        Returns a list of Bangla words that should be boosted in the
-        suggestion list given the previous word context.
+        Ranks the words likely after the context. The corpus model is one
+        binary search for prev_word; without it, hand-written pairs whose
+        prefix starts prev_word are found by looking up its prefixes, so
+        the table size doesn't matter. The learned counts take two binary
+        searches per order, however much history the model holds.
         """
-        if not self.prev_word:
-            return []
+        prior = {}
+        prev = self.prev_word or ''
+        corpus = self.store.corpus_model() if prev else None
+        if corpus is not None:
+            for word, probability in corpus.next_words(prev):
+                prior[word] = self.CORPUS_PRIOR * probability
+        else:
+            for n in range(1, len(prev) + 1):
+                for word in self.bigrams.get(prev[:n], ()):
+                    prior[word] = self.PRIOR_COUNT
+
+        boosts = {}
+        if prev:
+            ranked = self.store.model.predict(self.prev_prev_word, prev, prior, self.MAX_BOOSTED)
+            for word, probability in ranked:
+                boost = min(self.MAX_BOOST, int(self.BOOST_SCALE * probability))
+                if boost > 0:
+                    boosts[word] = boost
 
-        boosted = []
-        for prefix, words in self.bigrams.items():
-            if self.prev_word.startswith(prefix):
-                boosted.extend(words)
+        self.boosts = boosts
+        self.boosted = list(boosts)
+        self.boosted_lengths = tuple(sorted({len(w) for w in boosts}))
+        self.version += 1
 
-        return boosted
+    def get_boosted_words(self):
+        """
+        Returns a list of Bangla words that should be boosted in the
+        suggestion list given the previous word context, best first.
+        """
+        return self.boosted
 
     def score_boost(self, word):
         """
         Returns a boost score for a word based on n-gram context.
-        Higher = more likely given the previous word.
+        Higher = more likely given the previous words. A word gets the
+        best boost of the boosted words it starts with: one dict lookup
+        per distinct boosted word length.
         """
-        boosted = self.get_boosted_words()
-        if not boosted:
+        boosts = self.boosts
+        if not boosts:
             return 0
 
-        for boost_word in boosted:
-            if word.startswith(boost_word) or word == boost_word:
-                return 50  # Strong context boost
-
-        return 0
+        best = 0
+        for n in self.boosted_lengths:
+            if n > len(word):
+                break
+            boost = boosts.get(word[:n], 0)
+            if boost > best:
+                best = boost
+        return best
@@ -0,0 +1,93 @@
+"""
+Corpus bigram model for AdorLipi (data/bigrams.bin).
+
+Built offline from Bengali text by tools/build_bigrams.py. ContextEngine
+uses it as prior knowledge of which words follow which, before the user's
+own typing says otherwise. The file uses the data artifact's section
+layout (see binary_data) with its own format version, and is
+memory-mapped, so a lookup reads only the pages of the word looked up.
+
+Sections:
+    meta  : JSON; 'kind': MODEL_KIND, the quantization and build statistics
+    words : sorted vocabulary (string table)
+    first : u32 per word plus one, start of its successors in next/score
+    next  : u32 successor word IDs, most probable first
+    score : u8 quantized probability of each successor (see quantize())
+"""
+import sys
+import math
+from .binary_data import ArtifactWriter, DataArtifact, StringMap
+
+MODEL_NAME = 'bigrams.bin'
+
+# Format of the sections below, independent of the dictionary artifact's
+# FORMAT_VERSION: a model keeps working when that changes
+MODEL_VERSION = 1
+MODEL_KIND = 'bigrams'
+
+# Quantization steps per halving of probability: a score q stands for
+# P = 2 ** (-q / SCORE_STEPS), so 255 covers P down to about 2 ** -16
+SCORE_STEPS = 16
+
+
+def quantize(probability):
+    """One byte for P(next | word), within 2.2% of the exact value."""
+    return min(255, max(0, round(-math.log2(probability) * SCORE_STEPS)))
+
+
+def dequantize(score):
+    return 2.0 ** (-score / SCORE_STEPS)
+
+
+class CorpusBigrams:
+    """A memory-mapped, read-only view of a corpus bigram model."""
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.meta = artifact.meta
+        self.words = artifact.strings('words')
+        self.index = StringMap(self.words, None)
+        self.first = artifact.array('first', 'I')
+        self.next = artifact.array('next', 'I')
+        self.score = artifact.array('score', 'B')
+        self._probabilities = [dequantize(q) for q in range(256)]
+
+    @classmethod
+    def open(cls, path):
+        """The model at `path`, or None if missing, not a bigram model or of another version."""
+        artifact = DataArtifact.open(path, version=MODEL_VERSION)
+        if artifact is None or artifact.meta.get('kind') != MODEL_KIND:
+            return None
+        return cls(artifact)
+
+    def next_words(self, word):
+        """[(next word, probability)] seen after `word`, most probable first."""
+        i = self.index.index(word)
+        if i < 0:
+            return []
+        lo, hi = self.first[i], self.first[i + 1]
+        words, probabilities = self.words, self._probabilities
+        return [(words[j], probabilities[q]) for j, q in zip(self.next[lo:hi], self.score[lo:hi])]
+
+
+def write_model(path, successors, meta):
+    """
+    Writes a model from `successors` (word -> [(next word, probability)],
+    most probable first). `meta` is stored alongside, e.g. build statistics.
+    """
+    vocabulary = sorted({w for word, pairs in successors.items() for w in [word] + [n for n, _ in pairs]})
+    ids = {word: i for i, word in enumerate(vocabulary)}
+    first, next_ids, scores = [0], [], []
+    for word in vocabulary:
+        for next_word, probability in successors.get(word, ()):
+            next_ids.append(ids[next_word])
+            scores.append(quantize(probability))
+        first.append(len(next_ids))
+
+    writer = ArtifactWriter(MODEL_VERSION)
+    writer.add_json('meta', dict(meta, kind=MODEL_KIND, byteorder=sys.byteorder, score_steps=SCORE_STEPS,
+                                 words=len(vocabulary), pairs=len(next_ids)))
+    writer.add_strings('words', vocabulary)
+    writer.add_array('first', 'I', first)
+    writer.add_array('next', 'I', next_ids)
+    writer.add_array('score', 'B', scores)
+    writer.write(path)
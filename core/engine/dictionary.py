@@ -1,12 +1,57 @@
 import json
 import os
-import difflib
+import threading
+from .binary_data import StringMap, Groups
+from .fuzzy_index import FuzzyIndex, BloomFilter
 
 class Dictionary:
-    def __init__(self, data_path):
+    # Targets kept per consonant skeleton, most frequent first
+    MAX_SKELETON_TARGETS = 8
+
+    # Memoized root_lookup results kept before the memo is reset
+    ROOT_MEMO_SIZE = 8192
+
+    # Lowest difflib ratio accepted by fuzzy_lookup
+    FUZZY_CUTOFF = 0.85
+
+    def __init__(self, data_path, artifact=None):
         self.data_path = data_path
         self.skeleton_index = {}
-        self.dictionary = self._load_dictionary()
+        self._fuzzy_index = None
+        self._fuzzy_thread = None
+        self._fuzzy_lock = threading.Lock()
+        self._root_memo = {}
+        if artifact is not None:
+            # Query the compiled artifact in place instead of parsing JSON
+            self.dictionary = StringMap(artifact.strings('dict.keys'), artifact.strings('dict.values'))
+            self.skeleton_index = StringMap(
+                artifact.strings('skel.keys'),
+                Groups(self.dictionary.keys(), artifact.array('skel.ids', 'I'), artifact.array('skel.start', 'I')),
+            )
+            self._fuzzy_index = FuzzyIndex(
+                self.dictionary.keys(),
+                artifact.array('fuzzy.hash', 'I'),
+                artifact.array('fuzzy.ids', 'I'),
+                BloomFilter(artifact.section('fuzzy.bloom')),
+            )
+        else:
+            self.dictionary = self._load_dictionary()
+
+    def start_fuzzy_index(self):
+        """
+        Starts building the deletion index on a daemon thread when loaded
+        from JSON. The build takes seconds; the engine starts it once the
+        rest of its data is loaded, so it doesn't slow startup down, and
+        it is usually ready by the first fuzzy_lookup, which waits for it.
+        """
+        with self._fuzzy_lock:
+            if self._fuzzy_index is None and self._fuzzy_thread is None:
+                self._fuzzy_thread = threading.Thread(target=self._build_fuzzy_index,
+                                                      name='adorlipi-fuzzy-index', daemon=True)
+                self._fuzzy_thread.start()
+
+    def _build_fuzzy_index(self):
+        self._fuzzy_index = FuzzyIndex.build(sorted(self.dictionary), cutoff=self.FUZZY_CUTOFF)
 
     def _load_dictionary(self):
         try:
@@ -25,38 +70,102 @@ class Dictionary:
         sk = word[0] + ''.join([c for c in word[1:] if c not in 'aeiouO'])
         return sk
 
+    def _load_frequencies(self):
+        freq_path = os.path.join(os.path.dirname(self.data_path), 'word_frequency.json')
+        try:
+            with open(freq_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
     def _build_skeletons(self, data):
-        """Build an index of skeleton keys pointing to the most likely full word."""
+        """
+        Build an index of skeleton keys pointing to every word sharing that
+        skeleton, ranked by the frequency of its Bangla form (then shortest).
+        """
+        freq = self._load_frequencies()
+        groups = {}
         for key in data.keys():
             # Skip very short words for skeletons to prevent aggressive mis-mapping
             if len(key) <= 3:
                 continue
-            sk = self._to_skeleton(key)
-            # Store shortest original word for a skeleton
-            if sk not in self.skeleton_index or len(key) < len(self.skeleton_index[sk]):
-                self.skeleton_index[sk] = key
+            groups.setdefault(self._to_skeleton(key), []).append(key)
+
+        for sk, keys in groups.items():
+            keys.sort(key=lambda k: (-freq.get(data[k], 0), len(k)))
+            self.skeleton_index[sk] = keys[:self.MAX_SKELETON_TARGETS]
 
     def exact_lookup(self, word):
         """Strict dictionary lookup for rigid suffix/prefix processing."""
         return self.dictionary.get(word.lower())
 
-    def skeleton_lookup(self, word):
+    def skeleton_candidates(self, word):
+        """
+        All Bangla words the input could be a vowel-dropped spelling of
+        ("dhnnbd" -> ধন্যবাদ, "amr" -> আমার, আমরা), most frequent first.
+        The input may keep its first letter and final vowels ("bhlo") but
+        no vowels in between, and needs three letters besides its final
+        vowels. One index probe: the input's skeleton selects the group,
+        and a key qualifies if dropping vowels from it yields the input.
+        """
         word = word.lower()
-        if len(word) >= 3:
-            sk = self._to_skeleton(word)
-            if sk == word and sk in self.skeleton_index:
-                real_word = self.skeleton_index[sk]
-                return self.dictionary[real_word]
-        return None
+        stem = word.rstrip('aeiou')
+        if len(stem) < 3 or self._to_skeleton(stem) != stem:
+            return []
+        keys = self.skeleton_index.get(stem)
+        if not keys:
+            return []
+
+        ending = word[len(stem):]
+        results = []
+        for key in keys:
+            if key.endswith(ending) and self._is_subsequence(word, key):
+                bangla = self.dictionary[key]
+                if bangla not in results:
+                    results.append(bangla)
+        return results
+
+    @staticmethod
+    def _is_subsequence(word, key):
+        it = iter(key)
+        return all(c in it for c in word)
+
+    def skeleton_lookup(self, word):
+        candidates = self.skeleton_candidates(word)
+        return candidates[0] if candidates else None
+
+    @property
+    def fuzzy_index(self):
+        """Deletion index for fuzzy_lookup; waits for the background build when loaded from JSON."""
+        if self._fuzzy_index is None:
+            self.start_fuzzy_index()
+            self._fuzzy_thread.join()
+        return self._fuzzy_index
 
     def fuzzy_lookup(self, word):
         word = word.lower()
         if len(word) >= 4:
-            matches = difflib.get_close_matches(word, self.dictionary.keys(), n=1, cutoff=0.85)
-            if matches:
-                return self.dictionary[matches[0]]
+            # Always the index: a difflib scan finds some matches it misses,
+            # and the token cache would keep whichever answer came first
+            match = self.fuzzy_index.best_match(word)
+            if match:
+                return self.dictionary[match]
         return None
 
+    def root_lookup(self, word):
+        """
+        Exact, then skeleton lookup of a suffix-stripped root, memoized:
+        the same roots recur across inflections of one word.
+        """
+        memo = self._root_memo
+        if word in memo:
+            return memo[word]
+        res = self.exact_lookup(word) or self.skeleton_lookup(word)
+        if len(memo) >= self.ROOT_MEMO_SIZE:
+            memo.clear()
+        memo[word] = res
+        return res
+
     def lookup(self, word):
         """
         Legacy layered dictionary lookup: Exact, Skeleton, Fuzzy
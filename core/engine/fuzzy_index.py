@@ -0,0 +1,136 @@
+import bisect
+import difflib
+import zlib
+from array import array
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over a pair of 32-bit hashes (double hashing).
+    A miss is definite, so it rejects hopeless lookups before any search.
+    """
+    PROBES = 3
+
+    def __init__(self, bits):
+        self.bits = bits  # bytearray, or a memoryview from the data artifact
+        self.mask = len(bits) * 8 - 1
+
+    @classmethod
+    def with_capacity(cls, n):
+        # ~16 bits per item keeps the false-positive rate well under 1%
+        size = 1 << max(13, (n * 16 - 1).bit_length())
+        return cls(bytearray(size // 8))
+
+    def add(self, h1, h2):
+        for i in range(self.PROBES):
+            bit = (h1 + i * h2) & self.mask
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+
+    def __contains__(self, hashes):
+        h1, h2 = hashes
+        for i in range(self.PROBES):
+            bit = (h1 + i * h2) & self.mask
+            if not self.bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion index over the dictionary keys, replacing a
+    difflib scan of every key in Dictionary.fuzzy_lookup.
+
+    Each key is indexed under itself and its deletion variants. Two words
+    sharing a deletion variant are candidate matches, and only those few
+    candidates are scored with difflib, so results follow the same ratio
+    cutoff and tie-breaking as difflib.get_close_matches.
+
+    A ratio >= cutoff bounds how many characters either side can lose to
+    reach their common subsequence, which gives the deletion depths below.
+    Depths are capped so the index stays small; the rare matches needing
+    more deletions than the caps are missed.
+    """
+    MAX_KEY_DELETES = 2
+    MAX_QUERY_DELETES = 3
+
+    def __init__(self, keys, hashes, ids, bloom, cutoff=0.85):
+        self.keys = keys      # Sorted dictionary keys; ids index into this
+        self.hashes = hashes  # Sorted crc32 of every deletion variant
+        self.ids = ids        # Key id for each entry in hashes
+        self.bloom = bloom    # Negative filter over the variant hashes
+        self.cutoff = cutoff
+
+    @classmethod
+    def build(cls, keys, cutoff=0.85):
+        entries = set()   # crc32 << 32 | key id
+        variants = set()  # crc32 << 32 | adler32, for the Bloom filter
+        for key_id, key in enumerate(keys):
+            word = key.lower()
+            depth = min(cls.MAX_KEY_DELETES, cls._max_deletes(len(word), cutoff))
+            for variant in cls._deletes(word, depth):
+                h1, h2 = cls._hash(variant)
+                entries.add((h1 << 32) | key_id)
+                variants.add((h1 << 32) | h2)
+
+        entries = sorted(entries)
+        hashes = array('I', [e >> 32 for e in entries])
+        ids = array('I', [e & 0xFFFFFFFF for e in entries])
+
+        bloom = BloomFilter.with_capacity(len(variants))
+        for v in variants:
+            bloom.add(v >> 32, v & 0xFFFFFFFF)
+        return cls(keys, hashes, ids, bloom, cutoff)
+
+    @staticmethod
+    def _max_deletes(length, cutoff):
+        """
+        Most characters a word of this length can drop and still reach a
+        ratio of `cutoff`: ratio = 2*M/(la+lb) with M <= common subsequence.
+        """
+        return int(length * (2 - 2 * cutoff) / (2 - cutoff))
+
+    @staticmethod
+    def _deletes(word, depth):
+        """The word plus every string made by deleting up to `depth` chars."""
+        variants = {word}
+        frontier = {word}
+        for _ in range(depth):
+            frontier = {w[:i] + w[i+1:] for w in frontier for i in range(len(w))}
+            variants |= frontier
+        return variants
+
+    @staticmethod
+    def _hash(variant):
+        raw = variant.encode('utf-8')
+        return zlib.crc32(raw), zlib.adler32(raw) | 1
+
+    def _candidates(self, word):
+        depth = min(self.MAX_QUERY_DELETES, self._max_deletes(len(word), self.cutoff))
+        hashes = self.hashes
+        found = set()
+        for variant in self._deletes(word, depth):
+            h1, h2 = self._hash(variant)
+            if (h1, h2) not in self.bloom:
+                continue
+            i = bisect.bisect_left(hashes, h1)
+            while i < len(hashes) and hashes[i] == h1:
+                found.add(self.ids[i])
+                i += 1
+        return found
+
+    def best_match(self, word):
+        """
+        The key closest to `word` with a difflib ratio >= cutoff, or None.
+        Ties resolve like difflib.get_close_matches(n=1).
+        """
+        best = None
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        for key_id in self._candidates(word):
+            key = self.keys[key_id]
+            matcher.set_seq1(key)
+            if (matcher.real_quick_ratio() >= self.cutoff
+                    and matcher.quick_ratio() >= self.cutoff):
+                score = matcher.ratio()
+                if score >= self.cutoff and (best is None or (score, key) > best):
+                    best = (score, key)
+        return best[1] if best else None
@@ -0,0 +1,74 @@
+import bisect
+
+# Pipeline stages in the order Transliterator tries them. 'cache' counts
+# words answered by the token cache without running any stage.
+STAGES = ('cache', 'user', 'exact', 'skeleton', 'suffix', 'fuzzy', 'pattern', 'phonetic')
+
+# Upper bounds (microseconds) of the per-word latency histogram buckets;
+# a final bucket holds everything slower.
+LATENCY_BUCKETS_US = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+
+class PipelineStats:
+    """
+    Opt-in counters for Transliterator, enabled by enable_stats().
+
+    Per stage it keeps how many words the stage resolved, the cumulative
+    time spent in the stage (including words it failed on and passed
+    down), and a latency histogram of whole-word resolution time for the
+    words it resolved.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.wins = dict.fromkeys(STAGES, 0)
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.histograms = {stage: [0] * (len(LATENCY_BUCKETS_US) + 1) for stage in STAGES}
+
+    def record(self, stage, seconds):
+        """Counts a word resolved by `stage` in `seconds` end to end."""
+        self.wins[stage] += 1
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_US, seconds * 1e6)
+        self.histograms[stage][bucket] += 1
+
+    def hit_rates(self):
+        """Share of words resolved by each stage."""
+        total = sum(self.wins.values())
+        return {stage: (n / total if total else 0.0) for stage, n in self.wins.items()}
+
+    def percentile(self, stage, fraction):
+        """
+        Upper bound (microseconds) of the histogram bucket holding the
+        given fraction of the stage's words, or None past the last bound.
+        """
+        counts = self.histograms[stage]
+        target = fraction * sum(counts)
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_US + (None,), counts):
+            seen += n
+            if n and seen >= target:
+                return bound
+        return 0
+
+    def snapshot(self):
+        """All counters as plain data."""
+        return {
+            'wins': dict(self.wins),
+            'seconds': dict(self.seconds),
+            'hit_rates': self.hit_rates(),
+            'histogram_bounds_us': LATENCY_BUCKETS_US,
+            'histograms': {stage: list(counts) for stage, counts in self.histograms.items()},
+        }
+
+    def report(self):
+        """A human-readable table of the counters."""
+        rates = self.hit_rates()
+        lines = [f"{'stage':<10}{'words':>9}{'share':>8}{'total ms':>11}{'p50 us':>9}{'p99 us':>9}"]
+        for stage in STAGES:
+            p50, p99 = self.percentile(stage, 0.5), self.percentile(stage, 0.99)
+            lines.append(
+                f"{stage:<10}{self.wins[stage]:>9}{rates[stage]:>8.1%}{self.seconds[stage] * 1000:>11.1f}"
+                f"{'>50000' if p50 is None else p50:>9}{'>50000' if p99 is None else p99:>9}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,316 @@
+"""
+Online n-gram model for AdorLipi.
+
+Learns bigram and trigram counts from the words a user commits, so
+ContextEngine can predict the next word from the last two. Counts are
+kept per integer word ID in flat arrays, decay with age and are pruned,
+so a year of typing stays a few megabytes and a lookup is two binary
+searches.
+"""
+import sys
+import json
+import time
+import heapq
+import bisect
+from array import array
+from itertools import repeat
+
+ID_BITS = 21
+ID_MASK = (1 << ID_BITS) - 1
+
+
+class _Table:
+    """
+    Counts of (history, word) pairs, where history is one word ID
+    (bigrams) or two packed IDs (trigrams). The pair is the integer
+    history << ID_BITS | word, so all words seen after one history are a
+    contiguous run of the sorted `keys` array, with `counts` alongside.
+
+    Updates go to the `recent` dict (history -> {word: count}) and are
+    merged into the arrays by merge().
+    """
+    def __init__(self, keys=None, counts=None):
+        self.keys = keys if keys is not None else array('q')
+        self.counts = counts if counts is not None else array('f')
+        self.recent = {}
+        self.recent_size = 0
+
+    def __len__(self):
+        return len(self.keys) + self.recent_size
+
+    def add(self, history, word, weight):
+        words = self.recent.get(history)
+        if words is None:
+            words = self.recent[history] = {}
+        if word not in words:
+            words[word] = 0.0
+            self.recent_size += 1
+        words[word] += weight
+
+    def get(self, history):
+        """word ID -> stored count, for the words seen after `history`."""
+        keys = self.keys
+        lo = bisect.bisect_left(keys, history << ID_BITS)
+        hi = bisect.bisect_left(keys, (history + 1) << ID_BITS, lo)
+        found = {key & ID_MASK: count for key, count in zip(keys[lo:hi], self.counts[lo:hi])}
+        for word, count in self.recent.get(history, {}).items():
+            found[word] = found.get(word, 0.0) + count
+        return found
+
+    def merge(self, limit, scale=1.0):
+        """
+        Folds `recent` into the arrays, multiplying every count by `scale`.
+        Above `limit` pairs, only the strongest 3/4 of `limit` are kept;
+        counts are stored with their decay applied (see NgramModel), so
+        these are the pairs seen rarely or long ago.
+        """
+        entries = dict(zip(self.keys, self.counts))
+        for history, words in self.recent.items():
+            base = history << ID_BITS
+            for word, count in words.items():
+                key = base | word
+                entries[key] = entries.get(key, 0.0) + count
+        if len(entries) > limit:
+            strongest = sorted(entries, key=entries.__getitem__, reverse=True)[:limit * 3 // 4]
+            entries = {key: entries[key] for key in strongest}
+        keys = sorted(entries)
+        self.keys = array('q', keys)
+        self.counts = array('f', [entries[key] * scale for key in keys])
+        self.recent = {}
+        self.recent_size = 0
+
+
+class NgramModel:
+    """
+    Unigram, bigram and trigram counts over the words in `words` (word ID
+    = index; `ids` maps back). Unigram counts are an array indexed by ID.
+
+    Decay: a use at time t counts 2 ** ((t - epoch) / HALF_LIFE), so every
+    older count loses weight relative to new ones without being touched.
+    The effective count at time now is the stored count divided by
+    weight(now). When that weight grows large, merge() divides everything
+    by it and moves the epoch.
+
+    Pruning: observe() only adds to the tables' recent updates, and
+    merge() folds them into the sorted arrays, cutting each table back
+    below its cap by dropping its weakest pairs. The owner merges once
+    unmerged() reaches MERGE_AFTER (ContextStore does, by compacting on
+    its background thread), so observing never pays for a merge.
+
+    Snapshots (save/load) are a JSON header line with the vocabulary,
+    followed by the raw arrays. save() also drops the words no remaining
+    pair refers to, so the vocabulary shrinks along with the tables.
+    """
+    FORMAT = 1
+
+    HALF_LIFE = 180 * 24 * 3600
+
+    MAX_BIGRAMS = 200000
+    MAX_TRIGRAMS = 200000
+
+    # Unmerged pairs at which the owner should merge
+    MERGE_AFTER = 20000
+
+    # Epoch weight at which merge() rescales the counts
+    RESCALE_ABOVE = 2.0 ** 16
+
+    # Absolute discount taken from every count for the lower order
+    DISCOUNT = 0.75
+
+    # Words a user may write: the unigram's add-one mass is spread over at
+    # least this many, so a new model doesn't make every word likely
+    VOCABULARY = 100000
+
+    def __init__(self, epoch=None):
+        self.epoch = time.time() if epoch is None else epoch
+        self.words = []
+        self.ids = {}
+        self.unigrams = array('f')
+        self.total = 0.0
+        self.bigrams = _Table()
+        self.trigrams = _Table()
+
+    def weight(self, now):
+        return 2.0 ** ((now - self.epoch) / self.HALF_LIFE)
+
+    def _id(self, word):
+        word_id = self.ids.get(word)
+        if word_id is None and len(self.words) < ID_MASK:
+            word_id = self.ids[word] = len(self.words)
+            self.words.append(word)
+            self.unigrams.append(0.0)
+        return word_id
+
+    def observe(self, prev_prev, prev, word, now=None):
+        """Counts `word` following `prev_prev prev` (either may be None)."""
+        if now is None:
+            now = time.time()
+        c = self._id(word)
+        if c is None:
+            return  # Vocabulary full
+        weight = self.weight(now)
+        self.unigrams[c] += weight
+        self.total += weight
+        b = self.ids.get(prev) if prev else None
+        if b is not None:
+            self.bigrams.add(b, c, weight)
+            a = self.ids.get(prev_prev) if prev_prev else None
+            if a is not None:
+                self.trigrams.add(a << ID_BITS | b, c, weight)
+
+    def unmerged(self):
+        """Pairs observed since the last merge()."""
+        return self.bigrams.recent_size + self.trigrams.recent_size
+
+    def merge(self, now=None):
+        """Merges recent updates into the arrays, pruning and rescaling."""
+        if now is None:
+            now = time.time()
+        scale = 1.0
+        weight = self.weight(now)
+        if weight > self.RESCALE_ABOVE:
+            scale = 1.0 / weight
+            self.epoch = now
+            self.unigrams = array('f', [count * scale for count in self.unigrams])
+            self.total *= scale
+        self.bigrams.merge(self.MAX_BIGRAMS, scale)
+        self.trigrams.merge(self.MAX_TRIGRAMS, scale)
+
+    def _prune_words(self):
+        """
+        Drops the words no bigram or trigram refers to and renumbers the
+        rest (after a merge). IDs keep their order, so the remapped keys
+        stay sorted.
+        """
+        used = set()
+        for key in self.bigrams.keys:
+            used.add(key >> ID_BITS)
+            used.add(key & ID_MASK)
+        for key in self.trigrams.keys:
+            used.add(key >> 2 * ID_BITS)
+            used.add(key >> ID_BITS & ID_MASK)
+            used.add(key & ID_MASK)
+        if len(used) == len(self.words):
+            return
+        kept = sorted(used)
+        new_ids = dict(zip(kept, range(len(kept))))
+        self.words = [self.words[i] for i in kept]
+        self.ids = {word: i for i, word in enumerate(self.words)}
+        self.unigrams = array('f', [self.unigrams[i] for i in kept])
+        self.bigrams.keys = array('q', [new_ids[key >> ID_BITS] << ID_BITS | new_ids[key & ID_MASK]
+                                        for key in self.bigrams.keys])
+        self.trigrams.keys = array('q', [(new_ids[key >> 2 * ID_BITS] << ID_BITS
+                                          | new_ids[key >> ID_BITS & ID_MASK]) << ID_BITS
+                                         | new_ids[key & ID_MASK] for key in self.trigrams.keys])
+
+    def _discounted(self, counts, decay, lower):
+        """
+        Interpolated absolute discounting of one order: every effective
+        count gives up min(DISCOUNT, count), and the mass given up is
+        spread by the lower order `lower(key)`. `counts` are stored counts
+        (effective = stored * decay). Returns (probability function, keys).
+        """
+        if not counts:
+            return lower, ()
+        total = sum(counts.values())
+        discount = self.DISCOUNT / decay
+        spare = sum(map(min, repeat(discount), counts.values())) / total
+
+        def probability(key):
+            count = counts.get(key, 0.0)
+            return (count - min(discount, count)) / total + spare * lower(key)
+        return probability, counts.keys()
+
+    def predict(self, prev_prev, prev, prior=None, limit=None, now=None):
+        """
+        [(word, probability)] of the likeliest words after `prev_prev
+        prev`, best first. `prior` maps words to pseudo-counts added to the
+        bigram counts of `prev`. Only words seen after the context (or in
+        `prior`) are returned; any other word has just its backed-off
+        probability.
+
+        With a `limit`, only the `limit` strongest bigram successors are
+        scored, with every trigram successor: below those, a word's
+        probability differs only by its share of the unigram mass.
+        Candidates are word IDs until the end, or the word itself for a
+        prior word the model hasn't seen.
+        """
+        if now is None:
+            now = time.time()
+        decay = 1.0 / self.weight(now)
+        words, ids, unigrams = self.words, self.ids, self.unigrams
+        vocabulary = max(len(words), self.VOCABULARY)
+        total = self.total * decay
+
+        def unigram(key):
+            count = unigrams[key] * decay if key.__class__ is int else 0.0
+            # Add-one, so unseen words keep some probability
+            return (count + 1.0) / (total + vocabulary)
+
+        b = ids.get(prev) if prev else None
+        bigram_counts = self.bigrams.get(b) if b is not None else {}
+        for word, count in (prior or {}).items():
+            key = ids.get(word, word)
+            bigram_counts[key] = bigram_counts.get(key, 0.0) + count / decay
+        bigram, candidates = self._discounted(bigram_counts, decay, unigram)
+
+        a = ids.get(prev_prev) if prev_prev and b is not None else None
+        trigram_counts = self.trigrams.get(a << ID_BITS | b) if a is not None else {}
+        trigram, seen = self._discounted(trigram_counts, decay, bigram)
+
+        if limit is not None and len(candidates) > limit:
+            candidates = heapq.nlargest(limit, candidates, key=bigram_counts.__getitem__)
+        ranked = sorted([(trigram(key), key) for key in set(candidates) | set(seen)],
+                        key=lambda entry: entry[0], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(words[key] if key.__class__ is int else key, probability) for probability, key in ranked]
+
+    def save(self):
+        """
+        The model as snapshot bytes, after merging the recent updates and
+        dropping unreferenced words (this renumbers the model's words).
+        """
+        self.merge()
+        self._prune_words()
+        header = {
+            'format': self.FORMAT,
+            'byteorder': sys.byteorder,
+            'epoch': self.epoch,
+            'total': self.total,
+            'words': self.words,
+            'bigrams': len(self.bigrams.keys),
+            'trigrams': len(self.trigrams.keys),
+        }
+        parts = [json.dumps(header, ensure_ascii=False).encode('utf-8'), b'\n']
+        for data in (self.unigrams, self.bigrams.keys, self.bigrams.counts,
+                     self.trigrams.keys, self.trigrams.counts):
+            parts.append(data.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a snapshot written by save(); an empty model if unreadable."""
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('format') != cls.FORMAT:
+                    return cls()
+                model = cls(header['epoch'])
+                model.total = header['total']
+                model.words = header['words']
+                model.ids = {word: i for i, word in enumerate(model.words)}
+                sections = []
+                for typecode, n in (('f', len(model.words)), ('q', header['bigrams']), ('f', header['bigrams']),
+                                    ('q', header['trigrams']), ('f', header['trigrams'])):
+                    data = array(typecode)
+                    data.fromfile(f, n)
+                    if header['byteorder'] != sys.byteorder:
+                        data.byteswap()
+                    sections.append(data)
+        except (OSError, ValueError, KeyError, EOFError):
+            return cls()
+        model.unigrams = sections[0]
+        model.bigrams = _Table(sections[1], sections[2])
+        model.trigrams = _Table(sections[3], sections[4])
+        return model
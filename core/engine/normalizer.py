@@ -6,46 +6,48 @@ class Normalizer:
         # N=ণ, NG=ঙ, NGV=ঞ, J=য — must be preserved
         self.case_sensitive_chars = {'N', 'J'}
         self.case_sensitive_combos = {'NG', 'NGV'}
-        
+        # Preserved runs, longest first. 'NGV' has always come out as 'NgV':
+        # its placeholder used to be split by the 'NG' one.
+        self.case_pattern = re.compile(r'NGV|NG|[NJ]')
+        self.case_outputs = {'NGV': 'NgV', 'NG': 'NG', 'N': 'N', 'J': 'J'}
+
+        self.repeat_pattern = re.compile(r'(.)\1{2,}')
+
         self.replacements = [
-            (r'ph', 'f'),
-            (r'tmi', 'tumi'),
+            (re.compile(r'ph'), 'f'),
+            (re.compile(r'tmi'), 'tumi'),
         ]
-        
+
+    def _lower(self, text):
+        """Per-character lowercase (str.lower() maps a final 'Σ' differently)."""
+        if 'Σ' in text:
+            return ''.join([c.lower() for c in text])
+        return text.lower()
+
     def normalize(self, word):
         """
-        Normalizes a word: smart lowercasing (preserving N/J/NG), 
+        Normalizes a word: smart lowercasing (preserving N/J/NG),
         removing excessive repeats, and applying substitutions.
         """
         # 1. Smart lowercase: preserve N, J, NG, NGV
-        # Replace case-sensitive combos with placeholders first
-        preserved = word
-        preserved = preserved.replace('NGV', '\x01NGV\x01')
-        preserved = preserved.replace('NG', '\x01NG\x01')
-        
-        # Now process character by character
-        result = []
-        i = 0
-        while i < len(preserved):
-            if preserved[i] == '\x01':
-                # Extract preserved combo
-                end = preserved.index('\x01', i + 1)
-                result.append(preserved[i+1:end])
-                i = end + 1
-            elif preserved[i] in self.case_sensitive_chars:
-                result.append(preserved[i])
-                i += 1
-            else:
-                result.append(preserved[i].lower())
-                i += 1
-        
-        word = ''.join(result)
-        
+        lowered = self._lower(word)
+        if lowered != word:
+            if 'N' in word or 'J' in word:
+                parts = []
+                pos = 0
+                for m in self.case_pattern.finditer(word):
+                    parts.append(self._lower(word[pos:m.start()]))
+                    parts.append(self.case_outputs[m.group()])
+                    pos = m.end()
+                parts.append(self._lower(word[pos:]))
+                lowered = ''.join(parts)
+            word = lowered
+
         # 2. Remove repeated characters (more than 2) -> reduce to 1
-        word = re.sub(r'(.)\1{2,}', r'\1', word)
-        
+        word = self.repeat_pattern.sub(r'\1', word)
+
         # 3. Apply specific replacements
         for pattern, replacement in self.replacements:
-            word = re.sub(pattern, replacement, word)
+            word = pattern.sub(replacement, word)
 
         return word
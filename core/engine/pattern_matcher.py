@@ -0,0 +1,65 @@
+import re
+
+# Regex metacharacters; a ^...$ rule without any of them is a plain word
+_META = set('.^$*+?{}[]\\|()')
+
+class PatternMatcher:
+    """
+    The patterns.json heuristics, compiled once into a combined matcher.
+
+    Rules apply first-match-wins: the first rule whose regex matches
+    anywhere in the word rewrites it with re.sub. Whole-word literal rules
+    (^word$) are looked up in a dict. Other rules are joined into one
+    alternation of lookaheads anchored at the start of the word, tried in
+    rule order, so one search finds the first matching rule. Rules that
+    cannot be combined (capture groups, backreferences, inline flags) are
+    checked on their own, in order.
+    """
+    def __init__(self, patterns):
+        self.rules = [(p['regex'], p['replace']) for p in patterns]
+        self.literals = {}  # word -> index of the first ^word$ rule
+        self.separate = []  # indices of rules checked one by one
+        self._compiled = {}  # rule index -> compiled regex, on first use
+
+        alternatives = []
+        for i, (regex, _) in enumerate(self.rules):
+            body = regex[1:-1]
+            if regex.startswith('^') and regex.endswith('$') and not _META.intersection(body):
+                self.literals.setdefault(body, i)
+                continue
+            compiled = re.compile(regex)
+            if compiled.groups or compiled.flags & ~re.UNICODE:
+                self.separate.append(i)
+            else:
+                alternatives.append(f"(?P<r{i}>(?=[\\s\\S]*?(?:{regex})))")
+        self.combined = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def _regex(self, i):
+        compiled = self._compiled.get(i)
+        if compiled is None:
+            compiled = self._compiled[i] = re.compile(self.rules[i][0])
+        return compiled
+
+    def first_match(self, word):
+        """Index of the first rule matching `word`, or None."""
+        best = self.literals.get(word)
+        if self.combined is not None:
+            m = self.combined.match(word)
+            if m is not None:
+                i = int(m.lastgroup[1:])
+                if best is None or i < best:
+                    best = i
+        for i in self.separate:
+            if best is not None and i > best:
+                break
+            if self._regex(i).search(word):
+                best = i
+                break
+        return best
+
+    def apply(self, word):
+        """The word rewritten by the first matching rule, or None."""
+        i = self.first_match(word)
+        if i is None:
+            return None
+        return self._regex(i).sub(self.rules[i][1], word)
@@ -0,0 +1,97 @@
+"""
+Helpers for the user's state files under ~/.config/adorlipi: locking
+across processes, crash-safe replacement, and write-behind flushing off
+the keystroke path.
+"""
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX: callers still serialize their own threads
+    fcntl = None
+
+
+def config_dir():
+    """~/.config/adorlipi, created if missing."""
+    path = os.path.expanduser('~/.config/adorlipi')
+    if not os.path.exists(path):
+        try:
+            os.makedirs(path)
+        except Exception:
+            pass
+    return path
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """flock on `path` (created if missing), across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_atomic(path, data):
+    """Writes bytes to a temporary file and renames it over `path`."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def append_journal(path, data):
+    """
+    Appends encoded journal lines to `path` and fsyncs them (file lock
+    held). Returns the file's size before and after the append.
+    """
+    with open(path, 'a+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                # A crashed writer left a partial line; end it
+                data = b'\n' + data
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return size, size + len(data)
+
+
+class BackgroundWriter:
+    """
+    Calls flush() on a daemon thread `delay` seconds after notify(), so a
+    burst of notifications costs one write, and once more at exit. The
+    thread starts on the first notify().
+    """
+    def __init__(self, flush, delay, name):
+        self.flush = flush
+        self.delay = delay
+        self.name = name
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def notify(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            # The thread is a daemon; don't lose the last changes on exit
+            atexit.register(self.flush)
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.delay)
+            self._wakeup.clear()
+            self.flush()
@@ -3,33 +3,92 @@ import os
 import logging
 
 class PhoneticParser:
-    def __init__(self, mapping_path):
+    def __init__(self, mapping_path, artifact=None):
         self.mapping_path = mapping_path
         self.vowels = {}
         self.consonants = {}
         self.kars = {}
         self.folas = {}
         self.max_key_len = 0
-        self._load_mapping()
+        if artifact is not None and 'mapping' in artifact.sections:
+            self._apply_mapping(artifact.json('mapping'))
+        else:
+            self._load_mapping()
 
     def _load_mapping(self):
         try:
             with open(self.mapping_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.vowels = data.get("vowels", {})
-                self.consonants = data.get("consonants", {})
-                self.kars = data.get("kars", {})
-                self.folas = data.get("folas", {})
-                
-                # Pre-calculate max key length for greedy matching
-                all_keys = list(self.vowels.keys()) + list(self.consonants.keys()) + list(self.kars.keys()) + list(self.folas.keys())
-                if all_keys:
-                    self.max_key_len = max(len(k) for k in all_keys)
-                else:
-                    self.max_key_len = 1
+                self._apply_mapping(json.load(f))
         except FileNotFoundError:
             print(f"Error: Mapping file not found at {self.mapping_path}")
 
+    def _apply_mapping(self, data):
+        self.vowels = data.get("vowels", {})
+        self.consonants = data.get("consonants", {})
+        self.kars = data.get("kars", {})
+        self.folas = data.get("folas", {})
+
+        # Pre-calculate max key length for greedy matching
+        all_keys = list(self.vowels.keys()) + list(self.consonants.keys()) + list(self.kars.keys()) + list(self.folas.keys())
+        if all_keys:
+            self.max_key_len = max(len(k) for k in all_keys)
+        else:
+            self.max_key_len = 1
+
+        self._build_trie()
+
+    def _build_trie(self):
+        """
+        Compiles the fola, consonant and vowel keys into one character trie.
+        A node is a dict of child nodes; a node that ends a key also holds
+        a (fola, consonant, vowel) value triple under the key None.
+        """
+        self.trie = {}
+        for slot, table in enumerate((self.folas, self.consonants, self.vowels)):
+            for key, val in table.items():
+                node = self.trie
+                for ch in key:
+                    node = node.setdefault(ch, {})
+                values = list(node.get(None, (None, None, None)))
+                values[slot] = val
+                node[None] = tuple(values)
+
+    def _matches(self, word, i):
+        """
+        Every key that starts at word[i], as (length, (fola, consonant, vowel))
+        pairs, longest first. One walk down the trie.
+        """
+        matches = []
+        node = self.trie
+        for j in range(i, len(word)):
+            node = node.get(word[j])
+            if node is None:
+                break
+            values = node.get(None)
+            if values is not None:
+                matches.append((j + 1 - i, values))
+        matches.reverse()
+        return matches
+
+    def _consonant_runs(self, word):
+        """
+        One backward pass over the word. For each position p, greedily
+        reading longest consonant keys from p gives runs[p] consonants
+        (conjuncts count double) and reaches the end of the word iff
+        to_end[p]. Used by the 'o'-drop rule.
+        """
+        n = len(word)
+        runs = [0] * (n + 1)
+        to_end = [False] * (n + 1)
+        to_end[n] = True
+        for p in range(n - 1, -1, -1):
+            for length, (_, cons, _) in self._matches(word, p):
+                if cons is not None:
+                    runs[p] = runs[p + length] + (2 if len(cons) > 1 else 1)
+                    to_end[p] = to_end[p + length]
+                    break
+        return runs, to_end
+
     def parse(self, word):
         """
         Transliterates a single word using greedy left-to-right parsing with contextual heuristics.
@@ -40,19 +99,16 @@ class PhoneticParser:
         last_was_consonant = False
         implicit_vowel_dropped = False
         last_parsed_chunk = None
+        consonant_runs = None  # Lookahead tables, computed on first use
         
         while i < n:
             match_found = False
-            for length in range(self.max_key_len, 0, -1):
-                if i + length > n:
-                    continue
-                
-                chunk = word[i:i+length]
-                lower_chunk = chunk
+            # Candidate keys at i, longest first; the first one a rule accepts wins
+            for length, (fola_val, cons_val, vowel_val) in self._matches(word, i):
+                lower_chunk = word[i:i+length]
                 
                 # Check Fola Triggers FIRST
-                if last_was_consonant and lower_chunk in self.folas:
-                    fola_val = self.folas[lower_chunk]
+                if last_was_consonant and fola_val is not None:
                     # Avoid double hasant if the last output already ends with one (e.g., from a Ref)
                     if output and output[-1].endswith("\u09cd") and fola_val.startswith("\u09cd"):
                         output.append(fola_val[1:])
@@ -66,11 +122,11 @@ class PhoneticParser:
                     break
 
                 # Double Consonant Rule
-                if last_was_consonant and lower_chunk in self.consonants:
+                if last_was_consonant and cons_val is not None:
                     # Only trigger if the previously parsed explicit consonant chunk EXACTLY matches this one
                     if last_parsed_chunk == lower_chunk and len(lower_chunk) == 1:
                         output.append("\u09cd") # Virama
-                        output.append(self.consonants[lower_chunk])
+                        output.append(cons_val)
                         i += length
                         last_was_consonant = True
                         implicit_vowel_dropped = False
@@ -100,9 +156,8 @@ class PhoneticParser:
                             break
 
                 # Check Consonants
-                if lower_chunk in self.consonants:
-                    val = self.consonants[lower_chunk]
-                    output.append(val)
+                if cons_val is not None:
+                    output.append(cons_val)
                     i += length
                     last_was_consonant = True
                     implicit_vowel_dropped = False
@@ -111,7 +166,7 @@ class PhoneticParser:
                     break
                 
                 # Check Vowels
-                if lower_chunk in self.vowels:
+                if vowel_val is not None:
                     is_o = (lower_chunk == 'o' or lower_chunk == 'O')
                     
                     if last_was_consonant:
@@ -127,25 +182,11 @@ class PhoneticParser:
                                     if len(bn_char) > 1:
                                         drop_o = True
                             else:
-                                next_chunk = word[i+length:]
-                                temp_i = 0
-                                cons_count = 0
-                                while temp_i < len(next_chunk):
-                                    matched = False
-                                    for c_len in range(self.max_key_len, 0, -1):
-                                        if temp_i + c_len <= len(next_chunk):
-                                            chunk_key = next_chunk[temp_i:temp_i+c_len]
-                                            if chunk_key in self.consonants:
-                                                bn_val = self.consonants[chunk_key]
-                                                if len(bn_val) > 1:
-                                                    cons_count += 2
-                                                else:
-                                                    cons_count += 1
-                                                temp_i += c_len
-                                                matched = True
-                                                break
-                                    if not matched:
-                                        break
+                                # Consonants directly after the 'o', from the backward pass
+                                if consonant_runs is None:
+                                    consonant_runs = self._consonant_runs(word)
+                                runs, to_end = consonant_runs
+                                cons_count = runs[i + length]
                                 
                                 # If followed by vowel
                                 if cons_count == 0:
@@ -154,10 +195,10 @@ class PhoneticParser:
                                 elif cons_count >= 2:
                                     drop_o = True
                                 # If followed by 1 consonant and end of word (e.g., pagol) 
-                                elif cons_count == 1 and temp_i == len(next_chunk):
+                                elif cons_count == 1 and to_end[i + length]:
                                     # Heuristic for Banglish verb suffixes ending in -nor or -lor 
                                     # (e.g., ghuchan-o-r -> ঘুছানোর, shamlan-o-r -> শামলানোর)
-                                    if last_parsed_chunk in ['n', 'l'] and next_chunk == 'r':
+                                    if last_parsed_chunk in ['n', 'l'] and word[i+length:] == 'r':
                                         drop_o = False
                                     else:
                                         drop_o = True
@@ -173,7 +214,7 @@ class PhoneticParser:
                                 if kar is not None:
                                     output.append(kar)
                                 else:
-                                    output.append(self.vowels[lower_chunk])
+                                    output.append(vowel_val)
                                 last_was_consonant = False 
                                 implicit_vowel_dropped = False
                                 last_parsed_chunk = None
@@ -183,14 +224,14 @@ class PhoneticParser:
                             if kar is not None:
                                 output.append(kar)
                             else:
-                                output.append(self.vowels[lower_chunk])
+                                output.append(vowel_val)
                             last_was_consonant = False 
                             implicit_vowel_dropped = False
                             last_parsed_chunk = None
                             
                     else:
                         # Independent Vowel
-                        output.append(self.vowels[lower_chunk])
+                        output.append(vowel_val)
                         last_was_consonant = False
                         implicit_vowel_dropped = False
                         last_parsed_chunk = None
@@ -0,0 +1,154 @@
+import bisect
+import heapq
+import itertools
+from array import array
+from .binary_data import StringTable
+
+class PrefixIndex:
+    """
+    Sorted view over the suggestion word pool.
+
+    All words sharing a prefix sit in one contiguous slice of the sorted
+    array, so a prefix query is two binary searches instead of a full scan.
+    Words live in a StringTable (one UTF-8 blob + u32 offsets) and the
+    searches compare raw bytes, which sort in the same order as str.
+    When scores are supplied, a block sparse table over them answers
+    "best word in words[lo:hi]" in O(1), which gives exact top-k ranking
+    over any set of prefix ranges without scoring every match.
+    """
+    BLOCK = 32
+    # Each ranking key packs (score, -pool position) into one int so ties
+    # fall back to dictionary-file order.
+    POS_BITS = 20
+    POS_MASK = (1 << POS_BITS) - 1
+
+    def __init__(self, words, scores=None):
+        order = sorted(range(len(words)), key=words.__getitem__)
+        self.words = StringTable.from_strings(words[i] for i in order)
+        # Original pool position of each sorted word (dictionary-file order)
+        self.positions = array('I', order)
+        self.keys = None
+        self.sparse = []
+        if scores is not None:
+            self._build_ranking(scores)
+
+    @classmethod
+    def from_arrays(cls, words, positions, keys):
+        """
+        Wraps an index that is already sorted and ranked, e.g. the sequences
+        of a memory-mapped data artifact. Only the small sparse table over
+        blocks is built here.
+        """
+        index = cls.__new__(cls)
+        index.words = words
+        index.positions = positions
+        index.keys = keys
+        index._build_sparse()
+        return index
+
+    def __len__(self):
+        return len(self.words)
+
+    def prefix_range(self, prefix, lo=0, hi=None):
+        """
+        Returns (lo, hi) such that words[lo:hi] are exactly the words starting
+        with `prefix`. An existing (lo, hi) range can be passed in to narrow it.
+        """
+        if hi is None:
+            hi = len(self.words)
+        if not prefix:
+            return lo, hi
+        raw = self.words.raw
+        start = bisect.bisect_left(raw, prefix.encode('utf-8'), lo, hi)
+        # Smallest string greater than every word carrying this prefix
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        end = bisect.bisect_left(raw, upper.encode('utf-8'), start, hi)
+        return start, end
+
+    @classmethod
+    def ranking_keys(cls, scores, positions):
+        """Ranking keys for parallel sequences of scores and pool positions."""
+        return array('q', [(score << cls.POS_BITS) + (cls.POS_MASK - p) for score, p in zip(scores, positions)])
+
+    def _build_ranking(self, scores):
+        """Builds the ranking keys and the block sparse table over them."""
+        self.keys = self.ranking_keys([scores[p] for p in self.positions], self.positions)
+        self._build_sparse()
+
+    def _build_sparse(self):
+        n = len(self.keys)
+        row = array('l', [self._scan_argmax(b, min(b + self.BLOCK, n)) for b in range(0, n, self.BLOCK)])
+        self.sparse = [row]
+        blocks = len(row)
+        width = 1
+        while width * 2 <= blocks:
+            prev = row
+            row = array('l', [
+                prev[b] if self.keys[prev[b]] > self.keys[prev[b + width]] else prev[b + width]
+                for b in range(len(prev) - width)
+            ])
+            self.sparse.append(row)
+            width *= 2
+
+    def _scan_argmax(self, lo, hi):
+        chunk = self.keys[lo:hi].tolist()
+        return lo + chunk.index(max(chunk))
+
+    def argmax(self, lo, hi):
+        """Index of the highest-scoring word in words[lo:hi] (lo < hi)."""
+        first, last = lo // self.BLOCK, (hi - 1) // self.BLOCK
+        if last - first < 2:
+            return self._scan_argmax(lo, hi)
+
+        keys = self.keys
+        best = self._scan_argmax(lo, (first + 1) * self.BLOCK)
+        cand = self._scan_argmax(last * self.BLOCK, hi)
+        if keys[cand] > keys[best]:
+            best = cand
+
+        # Whole blocks in between: two overlapping sparse-table lookups
+        level = (last - first - 1).bit_length() - 1
+        row = self.sparse[level]
+        for cand in (row[first + 1], row[last - (1 << level)]):
+            if keys[cand] > keys[best]:
+                best = cand
+        return best
+
+    def top_k(self, ranges, k, exclude=(), expand=None):
+        """
+        Returns the sorted indices of the k best words across `ranges`,
+        best first. Each range is (lo, hi, bonus, state) and `bonus` is added
+        to the static score of every word in it. A word reachable through
+        several ranges is ranked by its highest total.
+
+        A range with a non-None `state` is a lazy trie node: its bonus is an
+        upper bound, and when it reaches the top of the queue it is replaced
+        by expand(state, lo, hi). Nodes that never reach the top are pruned.
+        """
+        keys = self.keys
+        tie = itertools.count()
+        heap = []
+
+        def push(lo, hi, bonus, state):
+            if lo < hi:
+                i = self.argmax(lo, hi)
+                heapq.heappush(heap, (-(keys[i] + (bonus << self.POS_BITS)), next(tie), i, lo, hi, bonus, state))
+
+        for entry in ranges:
+            push(*entry)
+
+        seen = set(exclude)
+        result = []
+        while heap and len(result) < k:
+            _, _, i, lo, hi, bonus, state = heapq.heappop(heap)
+            if state is not None:
+                for entry in expand(state, lo, hi):
+                    push(*entry)
+                continue
+            if i not in seen:
+                seen.add(i)
+                result.append(i)
+            # Split around the popped word and queue the best of each side
+            push(lo, i, bonus, None)
+            push(i + 1, hi, bonus, None)
+        return result
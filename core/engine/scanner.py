@@ -0,0 +1,72 @@
+# Suffixes typed as separate words ('mon e', 'kajta k') that are merged
+# into the previous word, one pass per suffix in this order
+MERGED_SUFFIXES = ['e', 'er', 'te', 'k', 'ke', 're', 'der']
+
+_ASCII_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+class Scanner:
+    """
+    Fused front end of the pipeline: pre-processing, tokenizing and
+    normalizing in one scan of the input.
+
+    scan(text) returns (token, normalized) pairs: the tokens of
+    Tokenizer.tokenize with standalone suffixes merged into the word
+    before them (see _merge_suffix) and, for word tokens, the result of
+    Normalizer.normalize; `normalized` is None for punctuation and
+    whitespace. The text is split once with the tokenizer's compiled
+    pattern, and suffix merging works on the tokens instead of running a
+    regex substitution per suffix over the whole text.
+    """
+    def __init__(self, tokenizer, normalizer):
+        self.tokenizer = tokenizer
+        self.normalizer = normalizer
+        self.suffixes = frozenset(MERGED_SUFFIXES)
+
+    def _merge_suffix(self, tokens, suffix):
+        """
+        One pre-processing pass on the token list: glues each standalone
+        `suffix` onto the word before it. It must follow whitespace after a
+        word ending in an ASCII letter, and be followed by whitespace, '.',
+        ',', '!', '?' or the end. Like re.sub, every condition is checked
+        against the list as it was before this pass.
+        """
+        n = len(tokens)
+        merges = set()
+        for k, token in enumerate(tokens):
+            if token != suffix or k < 2:
+                continue
+            if not tokens[k - 1][0].isspace() or tokens[k - 2][-1] not in _ASCII_LETTERS:
+                continue
+            if k + 1 < n:
+                follow = tokens[k + 1][0]
+                if not follow.isspace() and follow not in '.,!?':
+                    continue
+            merges.add(k)
+        if not merges:
+            return tokens
+
+        merged = []
+        for k, token in enumerate(tokens):
+            if k in merges:
+                merged.pop()  # The whitespace before the suffix
+                merged[-1] += token
+            else:
+                merged.append(token)
+        return merged
+
+    def tokens(self, text):
+        """The pre-processed tokens of `text`, without normalizing."""
+        tokens = self.tokenizer.tokenize(text)
+        # Every merge starts from a standalone suffix, so most texts skip
+        # the passes. Later passes also see words formed by earlier ones
+        # ('r e' -> 're').
+        if self.suffixes.isdisjoint(tokens):
+            return tokens
+        for suffix in MERGED_SUFFIXES:
+            tokens = self._merge_suffix(tokens, suffix)
+        return tokens
+
+    def scan(self, text):
+        is_word = self.tokenizer.is_word
+        normalize = self.normalizer.normalize
+        return [(token, normalize(token) if is_word(token) else None) for token in self.tokens(text)]
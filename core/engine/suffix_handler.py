@@ -61,18 +61,51 @@ class SuffixHandler:
             ("o", "ও")
         ]
 
-    def strip_suffix(self, word):
+        self._build_trie()
+
+    # Suffixes that can stack onto a root (root + গুলো + তে + ই)
+    MAX_STACK = 3
+
+    def _build_trie(self):
         """
-         Checks if word ends with a known suffix.
-         Returns (root, bangla_suffix) if found, else (word, None).
+        Trie over the reversed English suffixes, so every suffix a word ends
+        with is found in one backward walk. A node that ends a suffix holds
+        (list position, Bangla suffix) under the key None.
+        """
+        self.trie = {}
+        for priority, (suffix_en, suffix_bn) in enumerate(self.suffixes):
+            node = self.trie
+            for ch in reversed(suffix_en):
+                node = node.setdefault(ch, {})
+            node[None] = (priority, suffix_bn)
+
+    def splits(self, word):
         """
-        # Iterate through suffixes
-        for suffix_en, suffix_bn in self.suffixes:
-            if word.endswith(suffix_en):
-                # Ensure the root is at least 2 chars long to avoid over-stripping short words
-                # e.g. 'her' -> 'h'+'er'? 'ter'?
-                if len(word) > len(suffix_en) + 1:
-                    root = word[:-len(suffix_en)]
-                    return root, suffix_bn
-        
-        return word, None
+        Every way to read word as root + one or more stacked suffixes,
+        as (root, bangla_suffixes) pairs, each reading once. Single
+        suffixes come first, in list order; then stacks of two and three.
+        Roots keep at least 2 characters.
+        """
+        found = []
+
+        def walk(end, stack, bangla):
+            node = self.trie
+            # Stop at index 2 so the root keeps at least 2 characters
+            for i in range(end - 1, 1, -1):
+                node = node.get(word[i])
+                if node is None:
+                    return
+                entry = node.get(None)
+                # Only the outermost suffix may be a single letter ('e', 'i',
+                # 'o'): 'der' + 'ke' + 'i' stacks, 'o' + 'o' does not
+                if entry is not None and (not stack or end - i > 1):
+                    priority, suffix_bn = entry
+                    found.append((len(stack) + 1, stack + (priority,), word[:i], suffix_bn + bangla))
+                    if len(stack) + 1 < self.MAX_STACK:
+                        walk(i, stack + (priority,), suffix_bn + bangla)
+
+        walk(len(word), (), "")
+        found.sort(key=lambda split: split[:2])
+        # Different stacks can spell the same reading ('gulote' is both
+        # one suffix and 'gulo' + 'te'); keep the first
+        return list(dict.fromkeys((root, bangla) for _, _, root, bangla in found))
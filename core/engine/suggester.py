@@ -1,5 +1,12 @@
 import os
+import copy
 import json
+import bisect
+import itertools
+import time
+from array import array
+from .prefix_index import PrefixIndex
+from .binary_data import StringMap, StringTable
 
 class Suggester:
     # Phonetic ambiguity map: characters that sound similar in Banglish
@@ -34,138 +41,356 @@ class Suggester:
         'ে': ['ৈ'],
     }
 
-    def __init__(self, data_path=None):
+    # Bonus for words matching the primary transliteration prefix
+    EXACT_BONUS = 30
+
+    # Length of the suggestion list
+    MAX_SUGGESTIONS = 5
+
+    # Words longer than LONG_WORD lose LENGTH_PENALTY points per extra letter
+    LONG_WORD = 8
+    LENGTH_PENALTY = 3
+
+    # Seconds between full rebuilds of the personal boost lookup
+    USAGE_REBUILD = 3600
+
+    def __init__(self, data_path=None, artifact=None):
         if data_path is None:
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             data_path = os.path.join(base_dir, 'data', 'openbangla_dictionary.json')
 
         self.word_pool = []
         self.word_freq = {}
-        self.context_engine = None
+        self._reset_ranking()
 
+        if artifact is not None:
+            self._load_artifact(artifact)
+            return
+
+        # Each word's position of first occurrence in the file (its
+        # dictionary-file order); the dict also drops duplicates
+        first = {}
         try:
             with open(data_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                seen = set()
-                for arr in data.values():
-                    for w in arr:
-                        if w not in seen:
-                            self.word_pool.append(w)
-                            seen.add(w)
+            for arr in data.values():
+                for w in arr:
+                    if w not in first:
+                        first[w] = len(first)
+            del data
         except Exception as e:
             print(f"Warning: Failed to load dictionary: {e}")
 
         # Load frequency data
         freq_path = os.path.join(os.path.dirname(data_path), 'word_frequency.json')
+        freq = {}
         try:
             with open(freq_path, 'r', encoding='utf-8') as f:
-                self.word_freq = json.load(f)
+                freq = json.load(f)
         except Exception:
             pass  # Frequency data is optional, falls back to length-based sorting
 
+        # Sorted prefix index ranked by the context-free part of the score,
+        # and a u16 frequency column beside it, filled in one pass over the
+        # sorted words. Only these compact arrays are kept.
+        words = sorted(first)
+        positions = array('I', list(map(first.__getitem__, words)))
+        del first
+        counts = list(map(freq.get, words, itertools.repeat(10)))
+        frequencies = array('H', [c if c < 0xFFFF else 0xFFFF for c in counts])
+        del freq
+        # _static_score of every word, from the frequencies just looked up
+        long_word, penalty = self.LONG_WORD, self.LENGTH_PENALTY
+        scores = [c - (len(w) - long_word) * penalty if len(w) > long_word else c for c, w in zip(counts, words)]
+        del counts
+        table = StringTable.from_strings(words)
+        del words
+        index = PrefixIndex.from_arrays(table, positions, PrefixIndex.ranking_keys(scores, positions))
+        self.prefix_index = index
+        self.word_pool = index.words
+        self.word_freq = StringMap(index.words, frequencies)
+
+    def _load_artifact(self, artifact):
+        """
+        Queries the pool in place from a memory-mapped data artifact. The
+        pool is then the sorted word table, and frequencies are looked up
+        by binary search over it.
+        """
+        words = artifact.strings('pool')
+        self.prefix_index = PrefixIndex.from_arrays(
+            words, artifact.array('pool.pos', 'I'), artifact.array('pool.key', 'q')
+        )
+        self.word_pool = words
+        self.word_freq = StringMap(words, artifact.array('pool.frq', 'H'))
+
+    def _reset_ranking(self):
+        """The per-input-context ranking state: context and usage boosts."""
+        self.context_engine = None
+        self._boost_version = None
+        self._boost_ranges = []
+
+        # Personal usage boosts, rebuilt from the UsageModel when it changes:
+        # sorted prefix index positions and the boost of each, plus the
+        # same boosts by word for _score_word
+        self.usage_model = None
+        self._usage_version = None
+        self._usage_built = 0.0
+        self._usage_index = {}  # word -> prefix index position or -1
+        self.usage_positions = []
+        self.usage_boosts = []
+        self.usage_scores = {}
+
+    def fork(self):
+        """
+        A Suggester sharing this one's word pool and indexes, which are
+        never modified, but with ranking state of its own, for another
+        input context.
+        """
+        other = copy.copy(self)
+        other._reset_ranking()
+        return other
+
     def set_context_engine(self, context_engine):
         """Allows the transliterator to inject the shared context engine."""
         self.context_engine = context_engine
+        self._boost_version = None
 
-    def _generate_variants(self, target):
-        """
-        Deep ambiguity: generate alternate Bangla strings by replacing
-        EACH ambiguous character (not just the first one).
-        Capped at 10 variants to prevent combinatorial explosion.
-        """
-        variants = [target]
-
-        for i, ch in enumerate(target):
-            if ch in self.AMBIGUOUS and len(variants) < 10:
-                new_variants = []
-                for v in variants:
-                    for alt in self.AMBIGUOUS[ch]:
-                        new_variants.append(v[:i] + alt + v[i+1:])
-                        if len(variants) + len(new_variants) >= 10:
-                            break
-                    if len(variants) + len(new_variants) >= 10:
-                        break
-                variants.extend(new_variants)
-
-        seen = set()
-        unique = []
-        for v in variants:
-            if v not in seen:
-                seen.add(v)
-                unique.append(v)
-        return unique
+    def _context_boosts(self):
+        """
+        (lo, hi, boost) prefix index ranges of the context-boosted words,
+        recomputed only when the context engine's boost set changes.
+        """
+        engine = self.context_engine
+        if not engine:
+            return []
+        if engine.version != self._boost_version:
+            index = self.prefix_index
+            # Every word under a boosted prefix shares that prefix's boost
+            ranges = []
+            for boost_word in engine.get_boosted_words():
+                lo, hi = index.prefix_range(boost_word)
+                if lo < hi:
+                    ranges.append((lo, hi, engine.score_boost(boost_word)))
+            self._boost_ranges = ranges
+            self._boost_version = engine.version
+        return self._boost_ranges
 
-    def _score_word(self, word, is_exact):
+    def set_usage_model(self, usage_model):
+        """Lets the user's UsageModel lift the words they actually pick."""
+        self.usage_model = usage_model
+        self._usage_version = None
+
+    def _refresh_usage(self):
+        """
+        Brings the personal boost lookup up to date with the usage model.
+        Usually only the words used since the last call are patched in;
+        the whole lookup is rebuilt after evictions, when too many updates
+        were missed, and every USAGE_REBUILD seconds so decay catches up.
+        """
+        model = self.usage_model
+        if model is None or model.version == self._usage_version:
+            return
+
+        now = time.time()
+        seen = self._usage_version
+        if (seen is None or model.evicted_at > seen or not model.changes
+                or model.changes[0][0] > seen + 1 or now - self._usage_built > self.USAGE_REBUILD):
+            self._rebuild_usage(now)
+        else:
+            for version, word in model.changes:
+                if version > seen:
+                    self._set_usage_boost(word, model.boost(word, now))
+        self._usage_version = model.version
+
+    def _usage_position(self, word):
+        """Prefix index position of a used word, or -1 if not in the pool."""
+        pos = self._usage_index.get(word)
+        if pos is None:
+            index = self.prefix_index
+            lo, hi = index.prefix_range(word)
+            pos = self._usage_index[word] = lo if lo < hi and index.words[lo] == word else -1
+        return pos
+
+    def _rebuild_usage(self, now):
+        boosts = self.usage_model.boosts(now)
+        # Forget the positions of words no longer in the model
+        self._usage_index = {word: self._usage_index[word] for word in boosts if word in self._usage_index}
+        boosted = sorted((self._usage_position(word), boost, word) for word, boost in boosts.items())
+        boosted = [entry for entry in boosted if entry[0] >= 0]
+        self.usage_positions = [pos for pos, _, _ in boosted]
+        self.usage_boosts = [boost for _, boost, _ in boosted]
+        self.usage_scores = {word: boost for _, boost, word in boosted}
+        self._usage_built = now
+
+    def _set_usage_boost(self, word, boost):
+        pos = self._usage_position(word)
+        if pos < 0:
+            return
+        positions, boosts = self.usage_positions, self.usage_boosts
+        i = bisect.bisect_left(positions, pos)
+        if i < len(positions) and positions[i] == pos:
+            if boost > 0:
+                boosts[i] = boost
+            else:
+                del positions[i], boosts[i]
+        elif boost > 0:
+            positions.insert(i, pos)
+            boosts.insert(i, boost)
+        if boost > 0:
+            self.usage_scores[word] = boost
+        else:
+            self.usage_scores.pop(word, None)
+
+    def _units(self, target):
         """
-        Composite scoring: frequency + context boost + exact-match bonus.
-        Higher score = more relevant suggestion.
+        Splits target into ambiguity units. Two-codepoint letters such as
+        'ড়' stay whole so their AMBIGUOUS class applies to them.
         """
-        score = 0
+        units = []
+        i = 0
+        while i < len(target):
+            step = 2 if target[i:i+2] in self.AMBIGUOUS else 1
+            units.append(target[i:i+step])
+            i += step
+        return units
 
+    def _static_score(self, word):
+        """
+        Context-free part of the score: frequency minus a length penalty.
+        Precomputed for the whole pool by the prefix index.
+        """
         # 1. Frequency score (how common is this word in Bengali?)
-        score += self.word_freq.get(word, 10)
+        score = self.word_freq.get(word, 10)
 
-        # 2. Exact-match bonus (word matched the primary transliteration prefix)
+        # 2. Length penalty for very long words (>8 chars are rarely useful)
+        if len(word) > self.LONG_WORD:
+            score -= (len(word) - self.LONG_WORD) * self.LENGTH_PENALTY
+
+        return score
+
+    def _score_word(self, word, is_exact):
+        """
+        Composite scoring: frequency + context boost + exact-match bonus
+        + personal usage boost. Higher score = more relevant suggestion.
+        """
+        score = self._static_score(word)
+
+        # Exact-match bonus (word matched the primary transliteration prefix)
         if is_exact:
-            score += 30
+            score += self.EXACT_BONUS
 
-        # 3. Context boost from N-gram engine (does it follow the previous word?)
+        # Context boost from N-gram engine (does it follow the previous word?)
         if self.context_engine:
             score += self.context_engine.score_boost(word)
 
-        # 4. Length penalty for very long words (>8 chars are rarely useful)
-        if len(word) > 8:
-            score -= (len(word) - 8) * 3
+        # Personal boost (how often has this user picked it lately?)
+        score += self.usage_scores.get(word, 0)
 
         return score
 
-    def get_suggestions(self, buffer, target_bangla):
+    def get_suggestions(self, buffer, target_bangla, nodes=None):
         """
         Production-grade suggestion engine with frequency + context ranking.
-        1. Generates deep phonetic variants of target_bangla.
-        2. Scans the full 150k word pool.
-        3. Ranks by composite score: frequency + context + exact-match.
+        1. Walks the prefix index as an implicit trie along target_bangla,
+           following every AMBIGUOUS alternative as an extra edge, so all
+           ambiguous spellings are explored in one traversal.
+        2. Expands the most promising node first: a subtree is only entered
+           while its best possible score can still make the top 5.
+        3. Returns the true top 5 by composite score
+           (frequency + context + exact-match + personal usage).
+        `nodes` is an optional prefix -> (lo, hi) cache of resolved trie
+        nodes, shared across calls by a SuggestionSession.
         """
         if not buffer or not target_bangla or not self.word_pool:
             return []
 
-        search_targets = self._generate_variants(target_bangla)
-        primary = target_bangla
+        index = self.prefix_index
+        units = self._units(target_bangla)
+        self._refresh_usage()
+        usage_positions, usage_boosts = self.usage_positions, self.usage_boosts
+
+        boosts = self._context_boosts()
+
+        def expand(state, lo, hi):
+            prefix, depth, exact = state
+            bonus = self.EXACT_BONUS if exact else 0
+            if depth == len(units):
+                # A complete spelling is not a completion of itself
+                if index.words[lo] == prefix:
+                    lo += 1
+                yield lo, hi, bonus, None
+                for b_lo, b_hi, boost in boosts:
+                    yield max(lo, b_lo), min(hi, b_hi), bonus + boost, None
+                # Personally used words on top of whatever else they get
+                for u in range(bisect.bisect_left(usage_positions, lo), bisect.bisect_left(usage_positions, hi)):
+                    pos = usage_positions[u]
+                    context = max([b for b_lo, b_hi, b in boosts if b_lo <= pos < b_hi], default=0)
+                    yield pos, pos + 1, bonus + context + usage_boosts[u], None
+                return
+
+            unit = units[depth]
+            for alt in [unit] + self.AMBIGUOUS.get(unit, []):
+                child = prefix + alt
+                span = nodes.get(child) if nodes is not None else None
+                if span is None:
+                    # Narrow the parent's range rather than searching the whole pool
+                    span = index.prefix_range(child, lo, hi)
+                    if nodes is not None:
+                        nodes[child] = span
+                c_lo, c_hi = span
+                if c_lo < c_hi:
+                    c_exact = exact and alt == unit
+                    # Upper bound for the subtree: exact bonus + best reachable boosts
+                    bound = self.EXACT_BONUS if c_exact else 0
+                    bound += max([b for b_lo, b_hi, b in boosts if b_lo < c_hi and c_lo < b_hi], default=0)
+                    u_lo = bisect.bisect_left(usage_positions, c_lo)
+                    u_hi = bisect.bisect_left(usage_positions, c_hi)
+                    if u_lo < u_hi:
+                        bound += max(usage_boosts[u_lo:u_hi])
+                    yield c_lo, c_hi, bound, (child, depth + 1, c_exact)
 
-        candidates = []  # List of (word, score) tuples
+        exclude = set()
+        lo, hi = index.prefix_range(target_bangla)
+        if lo < hi and index.words[lo] == target_bangla:
+            exclude.add(lo)
 
-        for word in self.word_pool:
-            if word == target_bangla:
-                continue
+        root = [(0, len(index), 0, ('', 0, True))]
+        return [index.words[i] for i in index.top_k(root, self.MAX_SUGGESTIONS, exclude, expand)]
 
-            # Check exact prefix
-            if word.startswith(primary):
-                score = self._score_word(word, is_exact=True)
-                candidates.append((word, score))
-                continue
+    def start_session(self):
+        """Returns a fresh SuggestionSession bound to this suggester."""
+        return SuggestionSession(self)
 
-            # Check ambiguous variant prefixes
-            for alt in search_targets[1:]:
-                if word.startswith(alt) and word != alt:
-                    score = self._score_word(word, is_exact=False)
-                    candidates.append((word, score))
-                    break
 
-            if len(candidates) >= 40:
-                break
+class SuggestionSession:
+    """
+    Suggestion state for one word while it is being typed.
 
-        # Sort by score descending (highest = most relevant)
-        candidates.sort(key=lambda x: -x[1])
+    Trie nodes resolved on earlier keystrokes are kept, so a keystroke that
+    extends the transliteration only narrows the deepest nodes. Results are
+    kept on a stack so Backspace restores the previous state in O(1).
+    """
+    def __init__(self, suggester):
+        self.suggester = suggester
+        self.nodes = {}  # Bangla prefix -> (lo, hi) range in the prefix index
+        self.stack = []  # (target_bangla, suggestions) per keystroke
 
-        # Deduplicate and return top 5
-        seen = set()
-        result = []
-        for word, score in candidates:
-            if word not in seen:
-                seen.add(word)
-                result.append(word)
-            if len(result) >= 5:
-                break
+    def push(self, buffer, target_bangla):
+        """Computes suggestions for the next keystroke and records them."""
+        if self.stack and self.stack[-1][0] == target_bangla:
+            suggestions = self.stack[-1][1]
+        else:
+            suggestions = self.suggester.get_suggestions(buffer, target_bangla, self.nodes)
+        self.stack.append((target_bangla, suggestions))
+        return suggestions
 
-        return result
+    def pop(self):
+        """Drops the last keystroke and returns the restored suggestions."""
+        if self.stack:
+            self.stack.pop()
+        return self.stack[-1][1] if self.stack else []
 
+    def reset(self):
+        """Forgets all state; called when the word is committed or abandoned."""
+        self.nodes.clear()
+        self.stack.clear()
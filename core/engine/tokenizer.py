@@ -12,7 +12,7 @@ class Tokenizer:
         """
         Splits text into a list of tokens (words, punctuation, whitespace).
         """
-        return re.findall(r'\w+|[^\w\s]+|\s+', text)
+        return self.pattern.findall(text)
 
     def is_word(self, token):
         """
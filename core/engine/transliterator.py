@@ -5,146 +5,572 @@ from .phonetic_parser import PhoneticParser
 from .suffix_handler import SuffixHandler
 from .suggester import Suggester
 from .user_dictionary import UserDictionary
-from .context_engine import ContextEngine
+from .context_engine import ContextEngine, ContextStore
+from .pattern_matcher import PatternMatcher
+from .scanner import Scanner
+from .binary_data import DataArtifact, ARTIFACT_NAME
+from .corpus_bigrams import MODEL_NAME as CORPUS_MODEL_NAME
+from .instrumentation import PipelineStats
 import os
+import time
 import json
-import re
+import itertools
+import multiprocessing
+import threading
+from collections import OrderedDict, deque
+
+class EngineData:
+    """
+    What a process loads once per data directory and shares between its
+    Transliterators, e.g. one per IBus input context: the dictionaries,
+    the suggestion pool and its indexes, the phonetic mapping and the
+    patterns, none of which change after loading. The user's state goes
+    with it (learned words, usage and n-gram counts), as does the token
+    cache that memoizes the pipeline over both.
+
+    Per Transliterator remain only the context: ContextEngine history,
+    Suggester ranking caches and typing sessions.
+    """
+    _shared = {}  # (data_dir, pid) -> EngineData
+    _shared_lock = threading.Lock()
+
+    def __init__(self, data_dir, previous=None):
+        self.data_dir = data_dir
+
+        # Compiled binary data (tools/build_data.py), memory-mapped if present.
+        # Falls back to the JSON files when missing or stale.
+        artifact = DataArtifact.open(os.path.join(data_dir, ARTIFACT_NAME), data_dir)
+
+        self.dictionary = Dictionary(os.path.join(data_dir, 'dictionary.json'), artifact)
+        self.phonetic_parser = PhoneticParser(os.path.join(data_dir, 'mapping.json'), artifact)
+        self.suggester = Suggester(os.path.join(data_dir, 'openbangla_dictionary.json'), artifact)
+
+        # Load Patterns (Regex-based Fallback Heuristics)
+        self.patterns = []
+        try:
+            with open(os.path.join(data_dir, 'patterns.json'), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                self.patterns = data.get("patterns", [])
+        except FileNotFoundError:
+            pass
+        self.pattern_matcher = PatternMatcher(self.patterns)
+
+        # The user's state outlives a reload of the data files
+        if previous is not None:
+            self.user_dictionary = previous.user_dictionary
+            self.context_store = previous.context_store
+        else:
+            self.user_dictionary = UserDictionary()
+            self.context_store = ContextStore()
+        # Learned words invalidate their cached readings, in every
+        # EngineData over this user dictionary, e.g. one before a reload
+        self.user_dictionary.add_listener(self.forget_words)
+        # With corpus statistics (tools/build_bigrams.py) if built
+        self.context_store.set_corpus_model(os.path.join(data_dir, CORPUS_MODEL_NAME))
+
+        # Normalized word -> transliteration, most recently used last
+        self.token_cache = OrderedDict()
+
+        self.dictionary.start_fuzzy_index()
+
+    @classmethod
+    def get(cls, data_dir, reload=False):
+        """
+        The process's EngineData for `data_dir`, loaded on first use or
+        when `reload` is set. Keyed by process too, so a forked worker
+        loads its own rather than inheriting locks and writer threads.
+        """
+        key = (os.path.abspath(data_dir), os.getpid())
+        with cls._shared_lock:
+            data = cls._shared.get(key)
+            if data is None or reload:
+                data = cls._shared[key] = cls(data_dir, data)
+            return data
+
+    def forget_words(self, english_words):
+        """
+        Drops the cached readings of user dictionary words that changed;
+        None drops the whole cache.
+        """
+        if english_words is None:
+            self.token_cache.clear()
+            return
+        for word in [w for w in self.token_cache if w.lower() in english_words]:
+            del self.token_cache[word]
+
 
 class Transliterator:
+    # Normalized words whose pipeline result is memoized (LRU)
+    TOKEN_CACHE_SIZE = 4096
+
+    # Texts per unit of batch work: the dedup scope, and one pool task
+    BATCH_CHUNK = 1000
+
     def __init__(self, data_dir=None):
         if data_dir is None:
             # Default to ../../data relative to this file (core/engine/ -> root/data/)
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             data_dir = os.path.join(base_dir, 'data')
-            
+        self.data_dir = data_dir
+
         self.tokenizer = Tokenizer()
         self.normalizer = Normalizer()
-        self.dictionary = Dictionary(os.path.join(data_dir, 'dictionary.json'))
-        self.phonetic_parser = PhoneticParser(os.path.join(data_dir, 'mapping.json'))
+        self.scanner = Scanner(self.tokenizer, self.normalizer)
         self.suffix_handler = SuffixHandler()
-        self.suggester = Suggester(os.path.join(data_dir, 'openbangla_dictionary.json'))
-        self.user_dictionary = UserDictionary()
-        self.context_engine = ContextEngine()
-        
+        self.context_engine = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Tried in order until one returns a result
+        self.stages = [
+            ('user', self._user_stage),
+            ('exact', self._exact_stage),
+            ('skeleton', self._skeleton_stage),
+            ('suffix', self._suffix_stage),
+            ('fuzzy', self._fuzzy_stage),
+            ('pattern', self._pattern_stage),
+            ('phonetic', self._phonetic_stage),
+        ]
+        self.stats = None  # PipelineStats while enable_stats() is on
+
+        # The data files are loaded once per process (see EngineData)
+        self._attach(EngineData.get(data_dir))
+
+    def reload(self):
+        """
+        (Re)loads the data files and drops every memoized result. Later
+        Transliterators of the process share the reloaded data.
+        """
+        self._attach(EngineData.get(self.data_dir, reload=True))
+
+    def _attach(self, engine_data):
+        """Uses the shared `engine_data`, with a context of this instance's own."""
+        self.engine_data = engine_data
+        self.dictionary = engine_data.dictionary
+        self.phonetic_parser = engine_data.phonetic_parser
+        self.patterns = engine_data.patterns
+        self.pattern_matcher = engine_data.pattern_matcher
+        self.user_dictionary = engine_data.user_dictionary
+        self.token_cache = engine_data.token_cache
+        if self.context_engine is None:
+            self.context_engine = ContextEngine(engine_data.context_store)
+
         # Connect context engine to suggester for context-aware ranking
+        self.suggester = engine_data.suggester.fork()
         self.suggester.set_context_engine(self.context_engine)
-        
-        # Load Patterns (Regex-based Fallback Heuristics)
-        self.patterns = []
-        try:
-            with open(os.path.join(data_dir, 'patterns.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.patterns = data.get("patterns", [])
-        except FileNotFoundError:
-            pass
+        # ... and the user's own word usage for personalized ranking
+        self.suggester.set_usage_model(self.user_dictionary.usage)
 
-    def _pre_process(self, text):
+    def _last_word(self, buffer):
         """
-        Instantly merge common space-separated suffixes 
-        (e.g., 'mon e' -> 'mone', 'kajta k' -> 'kajtak')
-        before tokenizer splits them.
+        Returns the trailing word token of the buffer, or None when the buffer
+        ends in punctuation/whitespace (naked punctuation is never completed).
         """
-        suffixes = ['e', 'er', 'te', 'k', 'ke', 're', 'der']
-        for suf in suffixes:
-            # Match word chars, followed by space(s), followed by suffix, 
-            # and MUST be followed by space, punctuation or end of string.
-            pattern = r'(?<=[a-zA-Z])\s+(' + re.escape(suf) + r')(?=[\s\.,!\?]|$)'
-            text = re.sub(pattern, r'\1', text)
-        return text
+        if not buffer:
+            return None
+
+        # Tokenize to isolate punctuation from the actual alphanumeric word
+        tokens = self.tokenizer.tokenize(buffer)
+        if not tokens or not self.tokenizer.is_word(tokens[-1]):
+            return None
+        return tokens[-1]
 
     def get_suggestions(self, buffer):
         """
         Returns a list of auto-complete suggestions based on the user's current buffer.
         """
-        if not buffer:
-            return []
-        
-        # Tokenize to isolate punctuation from the actual alphanumeric word
-        tokens = self.tokenizer.tokenize(buffer)
-        if not tokens:
+        last_token = self._last_word(buffer)
+        if not last_token:
             return []
-            
-        last_token = tokens[-1]
-        
-        # Do not autocomplete naked punctuation marks (e.g. typing '"')
-        if not self.tokenizer.is_word(last_token):
-            return []
-            
+
         target_bangla = self.transliterate(last_token)
-        return self.suggester.get_suggestions(last_token, target_bangla)
+        suggestions = self.suggester.get_suggestions(last_token, target_bangla)
+        return self._merge_skeleton_candidates(last_token, target_bangla, suggestions)
+
+    def _merge_skeleton_candidates(self, word, target_bangla, suggestions):
+        """
+        Puts the other whole-word readings of a vowel-dropped word
+        ("amr" -> আমরা next to আমার) ahead of the prefix completions.
+        """
+        alternatives = [w for w in self.dictionary.skeleton_candidates(self.normalizer.normalize(word))
+                        if w != target_bangla]
+        if not alternatives:
+            return suggestions
+        merged = alternatives + [s for s in suggestions if s not in alternatives]
+        return merged[:self.suggester.MAX_SUGGESTIONS]
+
+    def compose(self, buffer):
+        """
+        Transliterates an input method buffer and ranks completions for its
+        last word in one pass. Returns a Composition holding the preedit,
+        the default commit text, the candidate list and per-token spans.
+        """
+        return self._compose(buffer, self.suggester.get_suggestions)
+
+    def _compose(self, buffer, suggest):
+        """
+        compose() with a pluggable suggest(last_word, target_bangla), so a
+        TypingSession can route it through its SuggestionSession.
+        """
+        self.user_dictionary.sync()
+        scanned = self.scanner.scan(buffer)
+        tokens = [token for token, _ in scanned]
+        parts = [self._transliterate_scanned(token, norm_word) for token, norm_word in scanned]
+
+        # The suggestion target is the last raw word; reuse its preedit
+        # rendering unless pre-processing merged it into the previous word.
+        last_word = self._last_word(buffer)
+        if not last_word:
+            last_word = target = ""
+        elif tokens and tokens[-1] == last_word:
+            target = parts[-1]
+        else:
+            target = self._transliterate_token(last_word)
+
+        suggestions = self._merge_skeleton_candidates(last_word, target, suggest(last_word, target))
+        return Composition(buffer, "".join(parts), suggestions, _spans(buffer, tokens, parts))
+
+    def start_session(self):
+        """
+        Returns a TypingSession for keystroke-by-keystroke input (IBus driver).
+        """
+        return TypingSession(self)
 
     def learn(self, english_word, bangla_word):
         """
         Teaches the engine a user's preferred transliteration.
         Called when user manually selects a non-default candidate.
         """
+        # Only the cached readings of the learned word change, in every
+        # token cache over the user dictionary (EngineData.forget_words)
         self.user_dictionary.learn(english_word, bangla_word)
 
+    def record_commit(self, bangla_text):
+        """
+        Counts the words of committed text in the personal usage model and
+        the context engine's n-gram model, so the words a user actually
+        writes, and writes after each other, rise in suggestions. The
+        context is the last committed word, cleared at a sentence end.
+        """
+        for token in bangla_text.split():
+            word = token.strip(' ।,.!?')
+            if word:
+                self.user_dictionary.record_use(word)
+                self.context_engine.learn(word)
+            if token.endswith(('।', '.', '!', '?')):
+                self.context_engine.clear_context()
+
     def transliterate(self, text):
         """
         Full pipeline: Pre-Process -> Tokenize -> Normalize -> Dict -> Suffix+Dict -> Patterns -> Phonetic -> Join
+        The first three stages run fused in one scan (see Scanner).
+        """
+        self.user_dictionary.sync()
+        return "".join([self._transliterate_scanned(token, norm_word) for token, norm_word in self.scanner.scan(text)])
+
+    def transliterate_many(self, texts, jobs=1, suggestions=False):
+        """
+        Transliterates an iterable of lines or documents, yielding the
+        results in input order. Texts are processed in chunks and each
+        distinct token of a chunk goes through the pipeline once. With
+        `suggestions`, yields (output, get_suggestions(text)) pairs.
+
+        With jobs > 1 the chunks are fanned out to a process pool whose
+        workers load the engine once each and compute the suggestions
+        too. At most two chunks per worker are in flight, so a streamed
+        input is never read ahead unbounded.
+        """
+        chunks = _chunks(texts, self.BATCH_CHUNK)
+        if jobs <= 1:
+            for chunk in chunks:
+                yield from self._transliterate_chunk(chunk, suggestions)
+            return
+
+        with multiprocessing.Pool(jobs, initializer=_init_batch_worker, initargs=(self.data_dir,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_batch_worker, (chunk, suggestions)))
+                if len(pending) >= 2 * jobs:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
+    def _transliterate_chunk(self, texts, suggestions=False):
+        """Transliterates a list of texts, resolving each distinct token once."""
+        self.user_dictionary.sync()
+        token_lists = [self.scanner.tokens(text) for text in texts]
+        resolved = {}
+        for tokens in token_lists:
+            for token in tokens:
+                if token not in resolved:
+                    resolved[token] = self._transliterate_token(token)
+        outputs = ["".join([resolved[token] for token in tokens]) for tokens in token_lists]
+        if suggestions:
+            return [(output, self.get_suggestions(text)) for output, text in zip(outputs, texts)]
+        return outputs
+
+    def _transliterate_token(self, token):
+        """
+        Runs a single token through the pipeline stages.
+        """
+        if not self.tokenizer.is_word(token):
+            return self.phonetic_parser.parse(token)
+
+        # 1. Normalize
+        return self._transliterate_scanned(token, self.normalizer.normalize(token))
+
+    def _transliterate_scanned(self, token, norm_word):
+        """
+        Pipeline stages after normalization; `norm_word` is None for
+        punctuation and whitespace tokens.
+        """
+        if norm_word is None:
+            return self.phonetic_parser.parse(token)
+
+        if self.stats is not None:
+            start = time.perf_counter()
+
+        cache = self.token_cache
+        result = cache.get(norm_word)
+        if result is not None:
+            cache.move_to_end(norm_word)
+            self.cache_hits += 1
+            if self.stats is not None:
+                self.stats.record('cache', time.perf_counter() - start)
+            return result
+
+        self.cache_misses += 1
+        if self.stats is None:
+            _, result = self._transliterate_word(norm_word)
+        else:
+            _, result = self._traced_word(norm_word, self.stats)
+        cache[norm_word] = result
+        if len(cache) > self.TOKEN_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+
+    def _transliterate_word(self, norm_word):
+        """
+        Runs a normalized word through the dictionary, suffix, fuzzy,
+        pattern and phonetic stages. Returns (stage name, result).
         """
-        text = self._pre_process(text)
-        tokens = self.tokenizer.tokenize(text)
-        result = []
-        
-        for token in tokens:
-            if self.tokenizer.is_word(token):
-                # 1. Normalize
-                norm_word = self.normalizer.normalize(token)
-                
-                # 2. User Dictionary (Machine Learning Override)
-                user_match = self.user_dictionary.lookup(norm_word)
-                if user_match:
-                    result.append(user_match)
-                    continue
-                
-                # 3. Exact Dictionary Lookup (Full Word)
-                dict_match = self.dictionary.exact_lookup(norm_word)
-                if dict_match:
-                    result.append(dict_match)
-                    continue
-
-                # 3. Skeleton Match (Full Word)
-                dict_match = self.dictionary.skeleton_lookup(norm_word)
-                if dict_match:
-                    result.append(dict_match)
-                    continue
-
-                # 4. Smart Suffix Handling
-                root, suffix_bn = self.suffix_handler.strip_suffix(norm_word)
-                if suffix_bn:
-                    root_match = self.dictionary.lookup(root)
-                    if root_match:
-                        result.append(root_match + suffix_bn)
-                        continue
-                        
-                # 5. Fuzzy Match (Typo tolerant full word Fallback)
-                fuzzy_match = self.dictionary.fuzzy_lookup(norm_word)
-                if fuzzy_match:
-                    result.append(fuzzy_match)
-                    continue
-                # 6. Pattern Matching (Regex Heuristics)
-                pattern_matched = False
-                for pat in self.patterns:
-                    if re.search(pat['regex'], norm_word):
-                        # Replace matching section
-                        parsed = re.sub(pat['regex'], pat['replace'], norm_word)
-                        # Transliterate the rest (if any) phonetically
-                        # This is simple for full word matches (^pattern$). 
-                        # If it's partial, we'd need more complex substitution. 
-                        # Given our patterns are strictly ^word$ based for now, direct substitution is fine.
-                        result.append(parsed)
-                        pattern_matched = True
-                        break
-                
-                if pattern_matched:
-                    continue
-                        
-                # 7. Phonetic Parsing (Fallback)
-                parsed = self.phonetic_parser.parse(norm_word)
-                result.append(parsed)
+        for stage, resolve in self.stages:
+            result = resolve(norm_word)
+            if result is not None:
+                return stage, result
+
+    # Pipeline stages after normalization, each returning None to pass the
+    # word on. Stage names match instrumentation.STAGES.
+
+    def _user_stage(self, norm_word):
+        # 2. User Dictionary (Machine Learning Override)
+        return self.user_dictionary.lookup(norm_word) or None
+
+    def _exact_stage(self, norm_word):
+        # 3. Exact Dictionary Lookup (Full Word)
+        return self.dictionary.exact_lookup(norm_word) or None
+
+    def _skeleton_stage(self, norm_word):
+        # 3. Skeleton Match (Full Word)
+        return self.dictionary.skeleton_lookup(norm_word) or None
+
+    def _suffix_stage(self, norm_word):
+        # 4. Smart Suffix Handling
+        splits = self.suffix_handler.splits(norm_word)
+        if splits:
+            # The primary split (single longest-listed suffix) may use a
+            # skeleton root; the alternatives, incl. stacked suffixes such
+            # as 'manush' + 'der' + 'ke', need an exact root
+            root, suffix_bn = splits[0]
+            root_match = self.dictionary.root_lookup(root)
+            if root_match:
+                return root_match + suffix_bn
+            for root, suffix_bn in splits[1:]:
+                root_match = self.dictionary.exact_lookup(root)
+                if root_match:
+                    return root_match + suffix_bn
+            # Typo tolerant root of the primary split
+            root, suffix_bn = splits[0]
+            root_match = self.dictionary.fuzzy_lookup(root)
+            if root_match:
+                return root_match + suffix_bn
+        return None
+
+    def _fuzzy_stage(self, norm_word):
+        # 5. Fuzzy Match (Typo tolerant full word Fallback)
+        return self.dictionary.fuzzy_lookup(norm_word) or None
+
+    def _pattern_stage(self, norm_word):
+        # 6. Pattern Matching (Regex Heuristics, first matching rule wins)
+        return self.pattern_matcher.apply(norm_word)
+
+    def _phonetic_stage(self, norm_word):
+        # 7. Phonetic Parsing (Fallback)
+        return self.phonetic_parser.parse(norm_word)
+
+    def _traced_word(self, norm_word, stats):
+        """_transliterate_word, also charging each stage's time to `stats`."""
+        seconds = stats.seconds
+        start = last = time.perf_counter()
+        for stage, resolve in self.stages:
+            result = resolve(norm_word)
+            now = time.perf_counter()
+            seconds[stage] += now - last
+            last = now
+            if result is not None:
+                stats.record(stage, now - start)
+                return stage, result
+
+    def enable_stats(self):
+        """
+        Starts collecting per-stage counters, timings and latency
+        histograms; returns the PipelineStats. Collection is off by default
+        and costs one attribute check per word while off.
+        """
+        if self.stats is None:
+            self.stats = PipelineStats()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    def explain(self, text):
+        """
+        Shows how each token of `text` is resolved, bypassing the token
+        cache: a list of dicts with the token, its normalized form (None
+        for punctuation and whitespace), the winning stage, the output and
+        the time taken in milliseconds.
+        """
+        self.user_dictionary.sync()
+        steps = []
+        for token, norm_word in self.scanner.scan(text):
+            start = time.perf_counter()
+            if norm_word is None:
+                stage, output = 'phonetic', self.phonetic_parser.parse(token)
             else:
-                result.append(self.phonetic_parser.parse(token))
-                
-        return "".join(result)
+                stage, output = self._transliterate_word(norm_word)
+            steps.append({
+                'token': token,
+                'normalized': norm_word,
+                'stage': stage,
+                'output': output,
+                'ms': (time.perf_counter() - start) * 1000,
+            })
+        return steps
+
+
+def _chunks(iterable, size):
+    """Splits an iterable into lists of up to `size` items, lazily."""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Per-process engine for transliterate_many's worker pool
+_batch_engine = None
+
+def _init_batch_worker(data_dir):
+    global _batch_engine
+    _batch_engine = Transliterator(data_dir)
+
+def _batch_worker(texts, suggestions):
+    return _batch_engine._transliterate_chunk(texts, suggestions)
+
+
+def _spans(buffer, tokens, parts):
+    """
+    (start, end, output) per token: buffer[start:end] became output. A
+    suffix merged by pre-processing ('mon e' -> 'mone') spans the
+    whitespace it absorbed.
+    """
+    spans = []
+    pos = 0
+    for token, output in zip(tokens, parts):
+        start = pos
+        for char in token:
+            while buffer[pos] != char:  # Whitespace dropped by a merge
+                pos += 1
+            pos += 1
+        spans.append((start, pos, output))
+    return spans
+
+
+class Composition:
+    """
+    What an input method shows and commits for one buffer, computed once
+    per keystroke (Transliterator.compose, TypingSession).
+
+    preedit      transliteration of the whole buffer, shown inline
+    commit       text committed by default (Space, Enter)
+    suggestions  ranked completions of the last word
+    candidates   lookup table entries: preedit, suggestions, raw buffer
+    spans        (start, end, output) per token, see _spans
+    """
+    def __init__(self, buffer, preedit, suggestions, spans):
+        self.buffer = buffer
+        self.preedit = preedit
+        self.commit = preedit
+        self.suggestions = suggestions
+        self.candidates = [preedit] + suggestions + [buffer] if buffer else []
+        self.spans = spans
+
+
+_EMPTY_COMPOSITION = Composition("", "", [], [])
+
+
+class TypingSession:
+    """
+    Keystroke-level front end to the Transliterator for input method drivers.
+
+    Every keystroke pushes a frame (a Composition) onto a stack, so
+    Backspace restores the previous frame in O(1) instead of re-running
+    the pipeline. Suggestion trie nodes are shared between the keystrokes
+    of a word through a SuggestionSession.
+    """
+    def __init__(self, transliterator):
+        self.transliterator = transliterator
+        self.suggestion_session = transliterator.suggester.start_session()
+        self.frames = []  # Composition per keystroke
+
+    @property
+    def composition(self):
+        return self.frames[-1] if self.frames else _EMPTY_COMPOSITION
+
+    @property
+    def buffer(self):
+        return self.composition.buffer
+
+    @property
+    def preedit(self):
+        return self.composition.preedit
+
+    @property
+    def suggestions(self):
+        return self.composition.suggestions
+
+    def append(self, text):
+        """Appends typed characters and computes the new frame."""
+        self.frames.append(self.transliterator._compose(self.buffer + text, self.suggestion_session.push))
+
+    def backspace(self):
+        """Removes the last character, restoring the frame before it."""
+        if not self.frames:
+            return
+        buffer = self.buffer[:-1]
+        self.frames.pop()
+        self.suggestion_session.pop()
+        # A frame appended with several characters at once cannot be
+        # restored from the stack; rebuild the remainder on top of it.
+        if self.buffer != buffer:
+            self.append(buffer[len(self.buffer):])
+
+    def reset(self):
+        """Clears the session after a commit, focus change or disable."""
+        self.frames.clear()
+        self.suggestion_session.reset()
+        if self.suggestion_session.suggester is not self.transliterator.suggester:
+            # The data was reloaded since the session started
+            self.suggestion_session = self.transliterator.suggester.start_session()
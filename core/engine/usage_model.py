@@ -0,0 +1,84 @@
+"""
+Personal usage model for AdorLipi.
+
+Counts how often the user writes each Bangla word, with older uses
+decaying away, so Suggester can rank the words a user actually picks
+above generally frequent ones.
+"""
+import time
+from collections import deque
+
+class UsageModel:
+    """
+    Decayed use count per Bangla word: every use adds 1 and the total
+    halves every HALF_LIFE seconds. At most MAX_WORDS words are kept; when
+    full, the eighth with the lowest decayed count (used rarely, or long
+    ago) is evicted.
+
+    `version` counts updates so readers can cache what they derive from
+    the model. The most recent updates are kept in `changes` as (version,
+    word), and `evicted_at` is the version of the last eviction, so a
+    reader can patch its cache instead of rebuilding it.
+    """
+    HALF_LIFE = 14 * 24 * 3600
+
+    MAX_WORDS = 2000
+
+    # Ranking points per (decayed) use, and their cap. Suggester frequency
+    # scores run from 10 to 140; the context boost is 50.
+    BOOST_PER_USE = 15
+    MAX_BOOST = 60
+
+    # Updates remembered in `changes`
+    CHANGE_LOG = 64
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}  # word -> [count, last used (epoch seconds)]
+        self.version = 0
+        self.changes = deque(maxlen=self.CHANGE_LOG)
+        self.evicted_at = 0
+
+    def _decayed(self, entry, now):
+        count, last_used = entry
+        return count * 0.5 ** (max(0.0, now - last_used) / self.HALF_LIFE)
+
+    def record(self, word, now=None):
+        """Counts one use of `word`."""
+        if now is None:
+            now = time.time()
+        entry = self.entries.get(word)
+        if entry is None:
+            if len(self.entries) >= self.MAX_WORDS:
+                self._evict(now)
+            self.entries[word] = [1.0, now]
+        else:
+            entry[0] = self._decayed(entry, now) + 1.0
+            entry[1] = now
+        self.version += 1
+        self.changes.append((self.version, word))
+
+    def _evict(self, now):
+        ranked = sorted(self.entries, key=lambda w: self._decayed(self.entries[w], now))
+        for word in ranked[:max(1, len(ranked) // 8)]:
+            del self.entries[word]
+        self.evicted_at = self.version + 1
+
+    def boost(self, word, now=None):
+        """Integer ranking boost of `word` (0 if unused)."""
+        entry = self.entries.get(word)
+        if entry is None:
+            return 0
+        if now is None:
+            now = time.time()
+        return min(self.MAX_BOOST, int(self.BOOST_PER_USE * self._decayed(entry, now)))
+
+    def boosts(self, now=None):
+        """word -> integer ranking boost, for words worth at least one point."""
+        if now is None:
+            now = time.time()
+        boosts = {}
+        for word in self.entries:
+            boost = self.boost(word, now)
+            if boost > 0:
+                boosts[word] = boost
+        return boosts
@@ -1,49 +1,231 @@
 import os
 import json
+import time
+import threading
+import weakref
+from contextlib import contextmanager
+from .usage_model import UsageModel
+from .persistence import BackgroundWriter, append_journal, config_dir, file_lock, write_atomic
 
 class UserDictionary:
+    """
+    The user's learned transliterations, persisted as a snapshot
+    (user_dict.json) plus an append-only journal of learn events
+    (user_dict.journal, one JSON [english, bangla] pair per line).
+
+    learn() only updates memory and queues the event. A background writer
+    appends queued events in batches and, once the journal is long,
+    compacts it into a new snapshot written to a temporary file and
+    renamed into place, so a crash at any point leaves a loadable state.
+
+    Several processes (IBus engines, the CLI, batch jobs) may share the
+    files. Appends and compactions hold an exclusive lock on
+    user_dict.lock and first read what other processes appended, so no
+    process overwrites another's words. Every compaction starts a journal
+    with a higher generation number in its header line; each process
+    remembers the generation it loaded and how far it has read, so sync()
+    merges new journal lines incrementally and reloads only after another
+    process compacted.
+
+    It also owns the personal UsageModel (usage.json), fed by record_use()
+    and saved by the same writer.
+    """
+    # Seconds the writer waits after a learn event so a burst of them is
+    # appended in one write
+    FLUSH_DELAY = 0.5
+
+    # Journal lines that trigger compaction into the snapshot
+    COMPACT_AFTER = 500
+
+    # Minimum seconds between two checks for other processes' changes
+    SYNC_INTERVAL = 1.0
+
     def __init__(self):
         # Store user dictionary in their local config directory
-        config_dir = os.path.expanduser('~/.config/adorlipi')
-        if not os.path.exists(config_dir):
-            try:
-                os.makedirs(config_dir)
-            except Exception:
-                pass
-        
-        self.data_path = os.path.join(config_dir, 'user_dict.json')
-        self.dictionary = self._load()
+        directory = config_dir()
+        self.data_path = os.path.join(directory, 'user_dict.json')
+        self.journal_path = os.path.join(directory, 'user_dict.journal')
+        self.lock_path = os.path.join(directory, 'user_dict.lock')
+        self.usage_path = os.path.join(directory, 'usage.json')
 
-    def _load(self):
+        self._lock = threading.Lock()  # dictionary, pending events, read position
+        self._write_lock = threading.Lock()  # the files, within this process
+        self._writer = BackgroundWriter(self.flush, self.FLUSH_DELAY, 'adorlipi-user-dict')
+        self._pending = []  # (english, bangla) learned here, not written yet
+        self._usage_dirty = False
+
+        self.generation = 0  # Of the loaded snapshot and journal
+        self._journal_offset = 0  # Bytes of the journal applied
+        self._synced = time.monotonic()
+        self._changed = set()  # Words changed elsewhere, not reported yet; None = all
+        self.journal_entries = 0
+
+        # Weak references to the callbacks of add_listener()
+        self._listeners = []
+
+        self.dictionary = {}
+        self._reload()
+        self.usage = UsageModel(self._load_usage())
+
+    def _load_usage(self):
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
+            with open(self.usage_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception:
             return {}
 
-    def _save(self):
+    def _journal_generation(self):
         try:
-            with open(self.data_path, 'w', encoding='utf-8') as f:
-                json.dump(self.dictionary, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"Warning: Failed to save user dictionary: {e}")
+            with open(self.journal_path, 'rb') as f:
+                return self._read_generation(f)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _read_generation(f):
+        """Generation in the journal's header line; 0 without one."""
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return 0
+        return header.get('generation', 0) if isinstance(header, dict) else 0
+
+    def _reload(self):
+        """Reads the snapshot and the whole journal."""
+        while True:
+            # The snapshot read is valid if the journal still has the same
+            # generation afterwards; otherwise a compaction ran in between
+            self.generation = self._journal_generation()
+            try:
+                with open(self.data_path, 'r', encoding='utf-8') as f:
+                    dictionary = json.load(f)
+            except Exception:
+                dictionary = {}
+
+            self._journal_offset = 0
+            self.journal_entries = 0
+            if self._read_journal(dictionary):
+                break
+        for english_word, bangla_word in self._pending:
+            dictionary[english_word] = bangla_word
+        self.dictionary = dictionary
+
+    def _read_journal(self, dictionary, changed=None):
+        """
+        Applies the complete journal lines past the read position. A line
+        still being written by another process is left for the next read.
+        Returns False, applying nothing, if the journal was restarted by a
+        compaction since this process loaded.
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                if self._read_generation(f) != self.generation:
+                    return False
+                f.seek(self._journal_offset)
+                data = f.read()
+        except OSError:
+            return True
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Left over from a write cut short by a crash
+            if not isinstance(entry, list) or len(entry) != 2:
+                continue  # The header
+            english_word, bangla_word = entry
+            dictionary[english_word] = bangla_word
+            if changed is not None:
+                changed.add(english_word)
+            self.journal_entries += 1
+        self._journal_offset += end
+        return True
+
+    def _catch_up(self):
+        """
+        Merges what other processes wrote since the last read, keeping this
+        process's unwritten events on top, and queues the changed words for
+        the next sync(). Safe from any thread.
+        """
+        with self._lock:
+            changed = set()
+            if not self._read_journal(self.dictionary, changed):
+                # Compacted elsewhere
+                self._reload()
+                self._changed = None
+                return
+            if not changed:
+                return
+            for english_word, bangla_word in self._pending:
+                self.dictionary[english_word] = bangla_word
+            if self._changed is not None:
+                self._changed |= changed
+
+    def sync(self):
+        """
+        Picks up other processes' learned words. The files are checked at
+        most every SYNC_INTERVAL seconds, so it is cheap to call on every
+        request; changed words are reported to the listeners.
+        """
+        now = time.monotonic()
+        if now - self._synced >= self.SYNC_INTERVAL:
+            self._synced = now
+            self._catch_up()
+        if self._changed is None or self._changed:
+            with self._lock:
+                changed, self._changed = self._changed, set()
+            self._notify(changed)
+
+    def add_listener(self, callback):
+        """
+        Calls the bound method `callback` with the english words that
+        changed, learned here or picked up by sync(), or with None when any
+        word may have changed. Held weakly: a listener lives as long as its
+        object, so every cache over this dictionary can register one.
+        """
+        self._listeners.append(weakref.WeakMethod(callback))
+
+    def _notify(self, changed):
+        live = []
+        for ref in self._listeners:
+            callback = ref()
+            if callback is not None:
+                callback(changed)
+                live.append(ref)
+        self._listeners = live
 
     def learn(self, english_word, bangla_word):
         """
         Saves a user's manual selection to permanently override default behavior.
+        Returns True if the mapping changed. The change is written to disk
+        in the background shortly after (see flush()).
         """
         if not english_word or not bangla_word:
-            return
-            
+            return False
+
         english_word = english_word.lower().strip()
         bangla_word = bangla_word.strip()
-        
+
         # Don't save if it's already the primary mapping
         if self.dictionary.get(english_word) == bangla_word:
-            return
-            
-        self.dictionary[english_word] = bangla_word
-        self._save()
+            return False
+
+        with self._lock:
+            self.dictionary[english_word] = bangla_word
+            self._pending.append((english_word, bangla_word))
+        self._writer.notify()
+        self._notify({english_word})
+        return True
+
+    def record_use(self, bangla_word):
+        """
+        Counts one use of a committed Bangla word in the usage model; saved
+        in the background like learn().
+        """
+        with self._lock:
+            self.usage.record(bangla_word)
+            self._usage_dirty = True
+        self._writer.notify()
 
     def lookup(self, english_word):
         """
@@ -52,3 +234,103 @@ class UserDictionary:
         if not english_word:
             return None
         return self.dictionary.get(english_word.lower().strip())
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the files, across threads and processes."""
+        with self._write_lock, file_lock(self.lock_path):
+            yield
+
+    def flush(self):
+        """
+        Appends the queued learn events to the journal, compacting it once
+        it reaches COMPACT_AFTER lines, and saves the usage model if it
+        changed. Called by the background writer and at exit; safe to call
+        from any thread.
+        """
+        if not self._pending and not self._usage_dirty:
+            return
+        try:
+            with self._file_lock():
+                # Taken under the lock, so a concurrent flush() in this
+                # process cannot write the same events twice
+                with self._lock:
+                    pending = list(self._pending)
+                    usage = None
+                    if self._usage_dirty:
+                        usage = {word: list(entry) for word, entry in self.usage.entries.items()}
+                        self._usage_dirty = False
+                if usage is not None:
+                    self._save_usage(usage)
+                if pending:
+                    self._append(pending)
+                    if self.journal_entries >= self.COMPACT_AFTER:
+                        self._compact_locked()
+        except Exception as e:
+            print(f"Warning: Failed to save user dictionary: {e}")
+
+    def _append(self, pending):
+        """Appends learn events to the journal (file lock held)."""
+        # Other processes' events come first in memory too, so memory
+        # always equals a replay of the journal
+        self._catch_up()
+        data = ''.join([json.dumps([e, b], ensure_ascii=False) + '\n' for e, b in pending]).encode('utf-8')
+        size, end = append_journal(self.journal_path, data)
+        with self._lock:
+            # Under the file lock nobody appended after _catch_up read to the end
+            if self._journal_offset == size:
+                self._journal_offset = end
+            self.journal_entries += len(pending)
+            del self._pending[:len(pending)]
+
+    def compact(self):
+        """
+        Folds the journal into a fresh snapshot. The snapshot is written to
+        a temporary file and atomically renamed over the old one before the
+        journal is emptied; replaying a journal already contained in the
+        snapshot is harmless.
+        """
+        with self._file_lock():
+            self._compact_locked()
+
+    def _compact_locked(self):
+        # Every process's events must be in the snapshot before the
+        # journal is emptied
+        self._catch_up()
+        with self._lock:
+            snapshot = dict(self.dictionary)
+        try:
+            self._write_snapshot(self.data_path, snapshot, indent=4)
+            # A new journal of the next generation, so processes holding
+            # an offset into the old one reload
+            generation = self.generation + 1
+            self._write_snapshot(self.journal_path, {'generation': generation})
+            with self._lock:
+                self.generation = generation
+                self._journal_offset = os.path.getsize(self.journal_path)
+                self.journal_entries = 0
+        except Exception as e:
+            print(f"Warning: Failed to compact user dictionary: {e}")
+
+    def _save_usage(self, usage):
+        """
+        Writes the usage model (file lock held), keeping words another
+        process recorded: per word, the entry used last wins.
+        """
+        try:
+            with open(self.usage_path, 'r', encoding='utf-8') as f:
+                on_disk = json.load(f)
+        except Exception:
+            on_disk = {}
+        for word, entry in on_disk.items():
+            mine = usage.get(word)
+            if mine is None or entry[1] > mine[1]:
+                usage[word] = entry
+        if len(usage) > UsageModel.MAX_WORDS:
+            recent = sorted(usage, key=lambda w: usage[w][1], reverse=True)[:UsageModel.MAX_WORDS]
+            usage = {word: usage[word] for word in recent}
+        self._write_snapshot(self.usage_path, usage)
+
+    def _write_snapshot(self, path, data, indent=None):
+        """Replaces `path` with a JSON document, atomically."""
+        write_atomic(path, (json.dumps(data, ensure_ascii=False, indent=indent) + '\n').encode('utf-8'))
@@ -31,6 +31,9 @@ Description: AdorLipi (আদরলিপি) - Modern Banglish Keyboard
  Type exactly how you speak on social media. Features a 10,000+ word conversational dictionary.
 EOT
 
+# Compile the binary data artifact (memory-mapped at startup)
+python3 "$PROJECT_ROOT/tools/build_data.py"
+
 # Copy files
 cp -r "$PROJECT_ROOT/core" "$DEB_DIR/usr/share/adorlipi/"
 cp -r "$PROJECT_ROOT/data" "$DEB_DIR/usr/share/adorlipi/"
@@ -21,6 +21,9 @@ fi
 # Setup RPM build environment
 mkdir -p "$BUILD_DIR/RPMS" "$BUILD_DIR/SOURCES" "$BUILD_DIR/SPECS" "$BUILD_DIR/BUILD" "$BUILD_DIR/SRPMS"
 
+# Compile the binary data artifact (memory-mapped at startup)
+python3 "$PROJECT_ROOT/tools/build_data.py"
+
 # Create the tarball of the current source for rpmbuild
 SOURCE_TAR="${PKG_NAME}-${VERSION}.tar.gz"
 echo "Creating source tarball..."
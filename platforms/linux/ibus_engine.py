@@ -35,7 +35,10 @@ logging.info(f"Successfully imported Transliterator from {project_root}")
 class AdorLipiEngine(IBus.Engine):
     def __init__(self):
         super().__init__()
+        # One per input context; the data files are shared, loaded once
+        # per process, so only the typing context is this engine's own
         self.transliterator = Transliterator()
+        self.session = self.transliterator.start_session()
         self.buffer = ""
         self.current_candidates = []
         self.lookup_table = IBus.LookupTable.new(10, 0, True, True)
@@ -51,7 +54,8 @@ class AdorLipiEngine(IBus.Engine):
         # Handle Backspace
         if keyval == IBus.BackSpace:
             if self.buffer:
-                self.buffer = self.buffer[:-1]
+                self.session.backspace()
+                self.buffer = self.session.buffer
                 self._update()
                 return True
             return False
@@ -95,8 +99,7 @@ class AdorLipiEngine(IBus.Engine):
         # Handle Space -> Commit buffer (Default Bangla) + space
         if keyval == IBus.space:
             if self.buffer:
-                bangla = self.transliterator.transliterate(self.buffer)
-                self._commit(bangla + " ")
+                self._commit(self.session.composition.commit + " ")
                 return True
             return False
 
@@ -109,7 +112,8 @@ class AdorLipiEngine(IBus.Engine):
         if keyval < 128:
             char = chr(keyval)
             if char.isprintable():
-                self.buffer += char
+                self.session.append(char)
+                self.buffer = self.session.buffer
                 self._update()
                 return True
             
@@ -136,6 +140,7 @@ class AdorLipiEngine(IBus.Engine):
         logging.debug("Engine focused OUT")
         # Wipe the volatile buffers so they don't bleed into other keyboards
         self.buffer = ""
+        self.session.reset()
         self.lookup_table.clear()
         self.hide_preedit_text()
         self.hide_lookup_table()
@@ -143,6 +148,7 @@ class AdorLipiEngine(IBus.Engine):
     def do_disable(self):
         logging.debug("Engine disabled")
         self.buffer = ""
+        self.session.reset()
         self.lookup_table.clear()
         self.hide_preedit_text()
         self.hide_lookup_table()
@@ -156,12 +162,12 @@ class AdorLipiEngine(IBus.Engine):
 
     def _update(self):
         if self.buffer:
-            bangla = self.transliterator.transliterate(self.buffer)
-            english = self.buffer
-            suggestions = self.transliterator.get_suggestions(self.buffer)
+            # The session already ran the pipeline for this keystroke
+            composition = self.session.composition
+            bangla = composition.preedit
             
             # Dynamic Suggestion Array: 1. Bangla -> [Suggestions...] -> English
-            self.current_candidates = [bangla] + suggestions + [english]
+            self.current_candidates = composition.candidates
             
             # Update Preedit (Show Bangla as default inline)
             text = IBus.Text.new_from_string(bangla)
@@ -184,19 +190,18 @@ class AdorLipiEngine(IBus.Engine):
             self.commit_text(IBus.Text.new_from_string(text))
             committed = text.strip()
         elif self.buffer:
-            bangla = self.transliterator.transliterate(self.buffer)
+            bangla = self.session.composition.commit
             logging.info(f"Committing default: {bangla}")
             self.commit_text(IBus.Text.new_from_string(bangla))
             committed = bangla.strip()
         
-        # Feed the committed word into the N-gram context engine
-        if committed and hasattr(self.transliterator, 'context_engine'):
-            # Extract last word (strip trailing space/punctuation)
-            last_word = committed.rstrip(' ।,.!?').split()[-1] if committed.strip() else None
-            if last_word:
-                self.transliterator.context_engine.set_context(last_word)
+        # Let the words the user writes rise in their suggestions, and feed
+        # them into the N-gram context engine
+        if committed:
+            self.transliterator.record_commit(committed)
             
         self.buffer = ""
+        self.session.reset()
         self.lookup_table.clear()
         self._update()
 
@@ -204,6 +209,9 @@ class AdorLipiService(IBus.Service):
     def __init__(self, connection):
         try:
             super().__init__() 
+            # Load the shared engine data (see EngineData) now rather than
+            # when the first input context is focused
+            Transliterator()
             self.factory = IBus.Factory.new(connection.get_connection())
             self.factory.add_engine("adorlipi", AdorLipiEngine)
             logging.info("AdorLipiService registered (Factory created)")
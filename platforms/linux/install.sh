@@ -48,7 +48,10 @@ else
     echo "Warning: Unknown distro. Please ensure python3-gi / python3-gobject is installed."
 fi
 
-echo "3. Copying files..."
+echo "3. Compiling data files..."
+python3 "$PROJECT_ROOT/tools/build_data.py" || echo "Warning: Could not compile data, the engine will load the JSON files."
+
+echo "4. Copying files..."
 mkdir -p $DEST_DIR
 
 # Copy core engine
@@ -66,10 +69,10 @@ cp -r "$PROJECT_ROOT/assets" "$DEST_DIR/"
 # Copy IBus component XML
 cp "$SCRIPT_DIR/adorlipi-ibus.xml" "$IBUS_COMPONENT_DIR/"
 
-echo "4. Setting permissions..."
+echo "5. Setting permissions..."
 chmod +x "$DEST_DIR/ibus_engine.py"
 
-echo "5. Refreshing IBus..."
+echo "6. Refreshing IBus..."
 ibus restart || echo "Could not restart IBus automatically. Please restart it manually."
 
 echo "-----------------------------------"
@@ -0,0 +1,36 @@
+"""
+Shared test fixtures. Engines keep the user's state under
+~/.config/adorlipi, so every test module runs against an empty home
+directory of its own instead of the developer's real dictionary.
+"""
+import os
+import tempfile
+
+from core.engine.transliterator import EngineData
+
+
+class IsolatedHome:
+    """
+    Points HOME at a temporary directory between start() and stop(), and
+    drops the process's shared EngineData on both, so engines created in
+    between load (and learn into) the temporary home only.
+    """
+    def start(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_home = os.environ.get('HOME')
+        os.environ['HOME'] = self.tmp.name
+        EngineData._shared.clear()
+        return self.tmp.name
+
+    def stop(self):
+        # Write out learned state now: exit-time flushes would find the
+        # directory already removed
+        for data in EngineData._shared.values():
+            data.user_dictionary.flush()
+            data.context_store.flush()
+        EngineData._shared.clear()
+        if self.saved_home is None:
+            os.environ.pop('HOME', None)
+        else:
+            os.environ['HOME'] = self.saved_home
+        self.tmp.cleanup()
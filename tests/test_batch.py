@@ -0,0 +1,55 @@
+"""
+Batch transliteration: the process pool of transliterate_many(jobs > 1)
+yields exactly what the single process does, in input order.
+"""
+import unittest
+
+from tests import support
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+LINES = [
+    'ami tomake bhalobashi',
+    'amar sonar bangla',
+    '',
+    'mon e porche, boigulote ki ache?',
+    'kajta k korbe',
+    '  ekti   line  ',
+    'ami',
+]
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestTransliterateMany(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.t = Transliterator()
+        # Several chunks, more than the pool keeps in flight
+        cls.t.BATCH_CHUNK = 3
+        cls.texts = [f'{line} {i}' if i % 5 else line for i, line in enumerate(LINES * 6)]
+
+    def test_pool_matches_one_process(self):
+        expected = list(self.t.transliterate_many(self.texts, jobs=1))
+        self.assertEqual(expected, [self.t.transliterate(text) for text in self.texts])
+        # A generator, as streamed from the CLI
+        self.assertEqual(list(self.t.transliterate_many(iter(self.texts), jobs=2)), expected)
+
+    def test_pool_with_suggestions(self):
+        expected = list(self.t.transliterate_many(self.texts, jobs=1, suggestions=True))
+        self.assertEqual(expected[0], (self.t.transliterate(self.texts[0]), self.t.get_suggestions(self.texts[0])))
+        self.assertEqual(list(self.t.transliterate_many(self.texts, jobs=2, suggestions=True)), expected)
+
+    def test_empty_input(self):
+        self.assertEqual(list(self.t.transliterate_many([], jobs=2)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Memory-mapped data files: staleness of the compiled artifact and the
+bigram model's own format version.
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from core.engine.binary_data import ArtifactWriter, DataArtifact, _source_record
+from core.engine.corpus_bigrams import CorpusBigrams, MODEL_NAME, write_model
+
+
+class TestStaleness(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.dir, 'mapping.json')
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write('{"vowels": {"a": "আ"}}')
+        writer = ArtifactWriter()
+        writer.add_json('meta', {'byteorder': sys.byteorder,
+                                 'sources': {'mapping.json': _source_record(self.source)}})
+        self.path = os.path.join(self.dir, 'adorlipi.bin')
+        writer.write(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_unchanged(self):
+        self.assertIsNotNone(DataArtifact.open(self.path, self.dir))
+
+    def test_touched_but_unchanged(self):
+        later = time.time() + 10
+        os.utime(self.source, (later, later))
+        self.assertIsNotNone(DataArtifact.open(self.path, self.dir))
+
+    def test_same_size_edit(self):
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write('{"vowels": {"A": "আ"}}')
+        # An edit after the build, even on coarse timestamps
+        later = time.time() + 10
+        os.utime(self.source, (later, later))
+        err, out = io.StringIO(), io.StringIO()
+        with redirect_stderr(err), redirect_stdout(out):
+            self.assertIsNone(DataArtifact.open(self.path, self.dir))
+        self.assertIn('out of date', err.getvalue())
+        self.assertEqual(out.getvalue(), '')
+
+    def write_corrupt(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_corrupt_falls_back(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        meta = data.index(b'{"byteorder"')
+        for corrupt in [b'ADL', data[:20], data[:meta + 5],
+                        data[:meta] + b'[' + data[meta + 1:],
+                        data[:meta] + b'\xff' + data[meta + 1:],
+                        data[:12] + b'x' * 24 + data[36:]]:
+            self.write_corrupt(corrupt)
+            self.assertIsNone(DataArtifact.open(self.path, self.dir), corrupt[:40])
+
+
+class TestBigramModel(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, MODEL_NAME)
+        write_model(self.path, {'আমি': [('তোমাকে', 0.5), ('যাবো', 0.25)]}, {'tokens': 3})
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        model = CorpusBigrams.open(self.path)
+        self.assertEqual([word for word, _ in model.next_words('আমি')], ['তোমাকে', 'যাবো'])
+        self.assertAlmostEqual(model.next_words('আমি')[0][1], 0.5, delta=0.5 * 0.022)
+        self.assertEqual(model.next_words('তোমাকে'), [])
+
+    def test_versioned_apart_from_the_artifact(self):
+        self.assertIsNone(DataArtifact.open(self.path))
+        artifact = os.path.join(self.dir, 'adorlipi.bin')
+        writer = ArtifactWriter()
+        writer.add_json('meta', {'kind': 'bigrams'})
+        writer.write(artifact)
+        self.assertIsNone(CorpusBigrams.open(artifact))
+
+
+if __name__ == '__main__':
+    unittest.main()
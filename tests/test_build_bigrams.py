@@ -0,0 +1,52 @@
+"""
+The corpus bigram builder: PMI is normalized over the pairs counted, so
+independent words score about 0 bits however short the lines are.
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from tools.build_bigrams import count_corpus, score_pairs, select
+
+WORDS = ['আমি', 'তুমি', 'সে', 'আমরা', 'তারা', 'বই', 'ঘর', 'জল', 'মাছ', 'ভাত']
+
+
+class TestPairScores(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def score(self, lines):
+        path = os.path.join(self.dir, 'corpus.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        lefts, rights, pairs, tokens, total_pairs = count_corpus([path], 1000, 1000)
+        self.assertEqual(total_pairs, sum(pairs.counts.values()))
+        return list(score_pairs(lefts.counts, rights.counts, pairs.counts, total_pairs, 1))
+
+    def test_independent_words_score_about_zero(self):
+        rng = random.Random(1)
+        # Short lines ending in a danda: many tokens have no pair
+        lines = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + '।' for _ in range(20000)]
+        scored = self.score(lines)
+        self.assertEqual(len(scored), len(WORDS) ** 2)
+        for word, next_word, n, pmi, probability in scored:
+            self.assertLess(abs(pmi), 0.3, (word, next_word))
+        kept = sum(len(pairs) for pairs in select(scored, 0.0, 32).values())
+        self.assertTrue(0 < kept < len(scored))
+
+    def test_pmi_over_pairs(self):
+        # 'আমি ভাত' is half of the pairs, every 'আমি' starts one of them
+        scored = {(word, next_word): (pmi, probability)
+                  for word, next_word, _, pmi, probability in self.score(['আমি ভাত', 'তুমি জল, সে'])}
+        self.assertAlmostEqual(scored['আমি', 'ভাত'][0], 1.0)
+        self.assertEqual(scored['আমি', 'ভাত'][1], 1.0)
+        self.assertNotIn(('জল', 'সে'), scored)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Compositions: the spans tile the buffer and join into the preedit, also
+where pre-processing merged a detached suffix into the word before it.
+"""
+import unittest
+
+from tests import support
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestSpans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.t = Transliterator()
+
+    def assertSpans(self, buffer, expected):
+        composition = self.t.compose(buffer)
+        self.assertEqual(composition.spans, expected)
+        self.assertEqual(''.join(output for _, _, output in composition.spans), composition.preedit)
+        # Contiguous from the start of the buffer to its end
+        ends = [0] + [end for _, end, _ in composition.spans]
+        self.assertEqual([start for start, _, _ in composition.spans], ends[:-1])
+        self.assertEqual(ends[-1], len(buffer))
+        return composition
+
+    def test_plain_words(self):
+        self.assertSpans('ami-r', [(0, 3, 'আমি'), (3, 4, '-'), (4, 5, 'আর')])
+
+    def test_merged_suffix_spans_the_whitespace(self):
+        self.assertSpans('mon e', [(0, 5, 'মনে')])
+        self.assertSpans('mon  e', [(0, 6, 'মনে')])
+        self.assertSpans('mon\te', [(0, 5, 'মনে')])
+        self.assertSpans('bari te', [(0, 7, 'বাড়িতে')])
+
+    def test_merged_suffix_between_words(self):
+        self.assertSpans('ami mon e, tumi', [
+            (0, 3, 'আমি'), (3, 4, ' '), (4, 9, 'মনে'), (9, 10, ','), (10, 11, ' '), (11, 15, 'তুমি'),
+        ])
+        self.assertSpans('mon e ', [(0, 5, 'মনে'), (5, 6, ' ')])
+
+    def test_stacked_suffixes(self):
+        self.assertSpans('manushderke', [(0, 11, 'মানুষদেরকে')])
+        # Only a single detached suffix is merged; the stack stays a word
+        self.assertSpans('manush der ke', [(0, 6, 'মানুষ'), (6, 7, ' '), (7, 13, 'দেরকে')])
+
+    def test_span_outputs_match_their_text(self):
+        buffer = 'ami mon e boigulote bari te, manush der ke'
+        for start, end, output in self.t.compose(buffer).spans:
+            self.assertEqual(self.t.transliterate(buffer[start:end]), output, buffer[start:end])
+
+    def test_candidates(self):
+        composition = self.assertSpans('mon e', [(0, 5, 'মনে')])
+        self.assertEqual(composition.commit, 'মনে')
+        self.assertEqual(composition.candidates,
+                         ['মনে'] + composition.suggestions + ['mon e'])
+        self.assertEqual(self.t.compose('').candidates, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Context boosts: the per-context index gives every word the boost a scan
+of all boosted words would, and the hand-written pairs are found by
+prefix lookups exactly as by scanning the table.
+"""
+import unittest
+
+from tests import support
+from core.engine.context_engine import ContextEngine, ContextStore
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+def scanned_boost(engine, word):
+    """score_boost as a linear scan: the best boosted word `word` starts with."""
+    return max((boost for boost_word, boost in engine.boosts.items() if word.startswith(boost_word)), default=0)
+
+
+def scanned_prior(engine, prev):
+    """The hand-written next words of `prev`, scanning the whole table."""
+    return {word for prefix, words in engine.bigrams.items() if prev.startswith(prefix) for word in words}
+
+
+class TestScoreBoost(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = Transliterator().suggester.prefix_index
+        cls.engine = ContextEngine(ContextStore())
+        # Contexts: every prefix of the table, extended as typed words are
+        contexts = set(cls.engine.bigrams)
+        contexts |= {prefix + 'র' for prefix in cls.engine.bigrams} | {prefix + 'ের' for prefix in cls.engine.bigrams}
+        cls.contexts = sorted(contexts) + ['অজানা']
+
+    def candidates(self, engine):
+        """Pool words under each boosted word, and the boosted words themselves."""
+        words = set(engine.boosts)
+        for boost_word in engine.boosts:
+            lo, hi = self.pool.prefix_range(boost_word)
+            words.update(self.pool.words[i] for i in range(lo, min(hi, lo + 50)))
+            words.add(boost_word[:-1])
+        return sorted(words)
+
+    def check_contexts(self, engine):
+        checked = 0
+        for prev in self.contexts:
+            engine.clear_context()
+            engine.set_context(prev)
+            for word in self.candidates(engine):
+                self.assertEqual(engine.score_boost(word), scanned_boost(engine, word), (prev, word))
+                checked += 1
+            self.assertEqual(engine.score_boost(''), 0)
+        self.assertGreater(checked, 1000)
+
+    def test_hand_written_pairs(self):
+        engine = self.engine
+        for prev in self.contexts:
+            engine.set_context(prev)
+            self.assertEqual(set(engine.get_boosted_words()), scanned_prior(engine, prev), prev)
+        self.check_contexts(engine)
+
+    def test_learned_counts(self):
+        # Learned next words of varied strength, some of them prefixes of
+        # others, so a word can start with several boosted words
+        engine = ContextEngine(ContextStore())
+        self.addCleanup(engine.store.flush)  # Before the home directory goes
+        for prev, words in [('আমি', ['ভালো', 'ভালোবাসি', 'ভালোবাসি', 'যাবো']),
+                            ('নদীর', ['ধারে', 'ধার', 'পারে', 'পারে', 'পারে'])]:
+            for word in words:
+                engine.clear_context()
+                engine.set_context(prev)
+                engine.learn(word)
+        self.check_contexts(engine)
+        engine.set_context('আমি')
+        self.assertEqual(engine.get_boosted_words()[0], 'ভালোবাসি')
+        self.assertGreater(engine.score_boost('ভালোবাসি'), engine.score_boost('ভালো'))
+
+    def test_no_context(self):
+        engine = ContextEngine(ContextStore())
+        engine.clear_context()
+        self.assertEqual(engine.get_boosted_words(), [])
+        self.assertEqual(engine.score_boost('ভালো'), 0)
+
+    def test_version_changes_with_the_context(self):
+        engine = ContextEngine(ContextStore())
+        version = engine.version
+        engine.set_context('আমি')
+        self.assertGreater(engine.version, version)
+        version = engine.version
+        engine.score_boost('তোমাকে')
+        self.assertEqual(engine.version, version)
+
+
+if __name__ == '__main__':
+    unittest.main()
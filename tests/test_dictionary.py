@@ -0,0 +1,23 @@
+"""
+Dictionary lookups loaded from JSON: fuzzy matches must not depend on
+whether the background deletion index has finished building.
+"""
+import os
+import unittest
+
+from core.engine.dictionary import Dictionary
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+class TestFuzzyLookup(unittest.TestCase):
+    def test_first_lookup_uses_the_index(self):
+        # difflib matches "aadhyatmikta" here, the deletion index nothing
+        dictionary = Dictionary(os.path.join(DATA_DIR, 'dictionary.json'))
+        self.assertIsNone(dictionary.fuzzy_lookup('aadhyatma'))
+        self.assertIsNone(dictionary.fuzzy_index.best_match('aadhyatma'))
+        self.assertEqual(dictionary.fuzzy_lookup('shakthi'), dictionary.lookup('shathi'))
+
+
+if __name__ == '__main__':
+    unittest.main()
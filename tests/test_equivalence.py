@@ -0,0 +1,128 @@
+"""
+Fuzz tests: the fused and compiled pipeline stages against the plain
+implementations they replaced (pre-processing regexes, a first-match
+rule loop, a scan of the suffix list).
+"""
+import random
+import re
+import unittest
+
+from core.engine.tokenizer import Tokenizer
+from core.engine.normalizer import Normalizer
+from core.engine.scanner import Scanner, MERGED_SUFFIXES
+from core.engine.pattern_matcher import PatternMatcher
+from core.engine.suffix_handler import SuffixHandler
+
+
+def reference_scan(text, tokenizer, normalizer):
+    """Suffix merging with one regex substitution per suffix, then tokenize and normalize."""
+    for suffix in MERGED_SUFFIXES:
+        text = re.sub(r'(?<=[a-zA-Z])\s+(' + re.escape(suffix) + r')(?=[\s\.,!\?]|$)', r'\1', text)
+    return [(token, normalizer.normalize(token) if tokenizer.is_word(token) else None)
+            for token in tokenizer.tokenize(text)]
+
+
+def reference_pattern(rules, word):
+    """The first rule whose regex matches rewrites the word; `rules` are (compiled, replace)."""
+    for regex, replace in rules:
+        if regex.search(word):
+            return regex.sub(replace, word)
+    return None
+
+
+def reference_splits(handler, word):
+    """Every root + stacked suffixes reading, found by trying each suffix."""
+    found = []
+
+    def strip(end, stack, bangla):
+        for priority, (suffix_en, suffix_bn) in enumerate(handler.suffixes):
+            start = end - len(suffix_en)
+            # Roots keep 2 characters; only the outermost suffix may be one letter
+            if start < 2 or not word.startswith(suffix_en, start) or (stack and len(suffix_en) == 1):
+                continue
+            found.append((len(stack) + 1, stack + (priority,), word[:start], suffix_bn + bangla))
+            if len(stack) + 1 < handler.MAX_STACK:
+                strip(start, stack + (priority,), suffix_bn + bangla)
+
+    strip(len(word), (), '')
+    found.sort(key=lambda split: split[:2])
+    readings = []
+    for _, _, root, bangla in found:
+        if (root, bangla) not in readings:
+            readings.append((root, bangla))
+    return readings
+
+
+class TestScanner(unittest.TestCase):
+    PIECES = ['r', 't', 'd', 'de', 'kk', 'e', 'e ', 'k ', ' e', 'er', 'te', 'k', 'ke', 're', 'der',
+              ' ', ' ', '  ', '\t', '\n', '.', ',', '!', '?', '-', ':', 'x', 'ab', 'NGV', 'NG', 'N',
+              'J', 'ph', 'tmi', 'aaa', 'Σ', 'ΑΣ', 'é', '1', '_', 'ami', 'mon', 'Kajta', 'PHONE', 'İ']
+
+    def setUp(self):
+        self.tokenizer = Tokenizer()
+        self.normalizer = Normalizer()
+        self.scanner = Scanner(self.tokenizer, self.normalizer)
+
+    def test_examples(self):
+        self.assertEqual(self.scanner.tokens('mon e'), ['mone'])
+        self.assertEqual(self.scanner.tokens('kajta k dao'), ['kajtak', ' ', 'dao'])
+
+    def test_matches_regex_preprocessing(self):
+        rng = random.Random(2)
+        for _ in range(20000):
+            text = ''.join(rng.choice(self.PIECES) for _ in range(rng.randint(1, 12)))
+            self.assertEqual(self.scanner.scan(text), reference_scan(text, self.tokenizer, self.normalizer), text)
+
+
+class TestPatternMatcher(unittest.TestCase):
+    def test_matches_first_rule_loop(self):
+        rng = random.Random(5)
+
+        def letters(lo, hi):
+            return ''.join(rng.choice('abcdkmnorst') for _ in range(rng.randint(lo, hi)))
+
+        rules = []
+        for i in range(1500):
+            kind = rng.random()
+            if kind < 0.7:
+                regex = '^' + letters(3, 6) + '$'
+            elif kind < 0.8:
+                regex = letters(2, 4) + '$'
+            elif kind < 0.88:
+                regex = '^' + letters(2, 3) + '[aeiou]+'
+            elif kind < 0.93:
+                regex = '(' + letters(2, 3) + r')\1'
+            elif kind < 0.96:
+                regex = '(?i)' + letters(3, 4).upper()
+            else:
+                regex = letters(3, 4) + '.?'
+            groups = r'\1' if '(' in regex and '(?i)' not in regex else ''
+            rules.append({'regex': regex, 'replace': f'X{i}' + groups})
+
+        matcher = PatternMatcher(rules)
+        compiled = [(re.compile(rule['regex']), rule['replace']) for rule in rules]
+        for _ in range(1000):
+            word = letters(2, 9)
+            self.assertEqual(matcher.apply(word), reference_pattern(compiled, word), word)
+
+
+class TestSuffixHandler(unittest.TestCase):
+    def setUp(self):
+        self.handler = SuffixHandler()
+
+    def test_each_reading_once(self):
+        splits = self.handler.splits('boigulote')
+        self.assertEqual(splits[0], ('boi', 'গুলোতে'))
+        self.assertEqual(len(splits), len(set(splits)))
+
+    def test_matches_suffix_scan(self):
+        rng = random.Random(3)
+        suffixes = [suffix_en for suffix_en, _ in self.handler.suffixes]
+        for _ in range(5000):
+            word = ''.join(rng.choice('aeioubkmnrst') for _ in range(rng.randint(1, 5)))
+            word += ''.join(rng.choice(suffixes) for _ in range(rng.randint(0, 3)))
+            self.assertEqual(self.handler.splits(word), reference_splits(self.handler, word), word)
+
+
+if __name__ == '__main__':
+    unittest.main()
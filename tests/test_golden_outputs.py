@@ -0,0 +1,81 @@
+"""
+Golden tests: the engine's transliterations and suggestions for a fixed
+set of inputs (dictionary words, synthetic and suffixed words, short
+sentences), recorded in tests/data/golden.json. Optimizations of the
+pipeline must reproduce them exactly; a change meant to alter outputs
+regenerates the file and shows the differences in review:
+
+    python3 -m tests.test_golden_outputs --regenerate
+"""
+import json
+import os
+import sys
+import unittest
+
+from tests import support
+from core.engine.transliterator import Transliterator
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'golden.json')
+
+home = support.IsolatedHome()
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+def load_golden():
+    with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestGoldenOutputs(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.golden = load_golden()
+        cls.t = Transliterator()
+
+    def assertMatchesGolden(self, expected, actual):
+        diffs = [(text, expected[text], actual[text]) for text in expected if actual[text] != expected[text]]
+        self.assertEqual(diffs, [], f"{len(diffs)} of {len(expected)} outputs differ, e.g. {diffs[:5]}")
+
+    def test_transliterations(self):
+        expected = self.golden['transliterate']
+        self.assertMatchesGolden(expected, {text: self.t.transliterate(text) for text in expected})
+
+    def test_batch_matches_single(self):
+        expected = self.golden['transliterate']
+        texts = list(expected)
+        self.assertMatchesGolden(expected, dict(zip(texts, self.t.transliterate_many(texts))))
+
+    def test_suggestions(self):
+        expected = self.golden['suggestions']
+        self.t.context_engine.clear_context()
+        self.assertMatchesGolden(expected, {text: self.t.get_suggestions(text) for text in expected})
+
+
+def regenerate():
+    """Rewrites the expected outputs for the recorded inputs."""
+    home.start()
+    try:
+        golden = load_golden()
+        engine = Transliterator()
+        golden['transliterate'] = {text: engine.transliterate(text) for text in golden['transliterate']}
+        golden['suggestions'] = {text: engine.get_suggestions(text) for text in golden['suggestions']}
+    finally:
+        home.stop()
+    with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, ensure_ascii=False, indent=0, sort_keys=True)
+        f.write('\n')
+    print(f"Wrote {GOLDEN_PATH}")
+
+
+if __name__ == '__main__':
+    if '--regenerate' in sys.argv:
+        regenerate()
+    else:
+        unittest.main()
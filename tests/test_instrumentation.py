@@ -0,0 +1,120 @@
+"""
+Pipeline instrumentation: enable_stats() counts each word against the
+stage that resolved it, and explain() names the same stages without
+touching the counters or the token cache.
+"""
+import unittest
+
+from tests import support
+from core.engine.instrumentation import LATENCY_BUCKETS_US, STAGES
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+# Word -> the stage that resolves it
+WORDS = {
+    'ami': 'exact',
+    'bhlo': 'skeleton',
+    'boigulote': 'suffix',
+    'shakthi': 'fuzzy',
+    'qzx': 'phonetic',
+}
+TEXT = ' '.join(WORDS) + ', ami.'
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.t = Transliterator()
+        self.t.token_cache.clear()
+
+    def tearDown(self):
+        self.t.disable_stats()
+
+    def test_counts_per_stage(self):
+        stats = self.t.enable_stats()
+        self.assertIs(self.t.enable_stats(), stats)
+        self.t.transliterate(TEXT)
+        expected = dict.fromkeys(STAGES, 0)
+        for stage in WORDS.values():
+            expected[stage] += 1
+        expected['cache'] = 1  # The second 'ami'
+        self.assertEqual(stats.wins, expected)
+        for stage in STAGES:
+            self.assertEqual(sum(stats.histograms[stage]), stats.wins[stage])
+            self.assertEqual(len(stats.histograms[stage]), len(LATENCY_BUCKETS_US) + 1)
+        # Stages are charged for the words they pass down, too
+        self.assertGreater(stats.seconds['user'], 0)
+        self.assertGreater(stats.seconds['pattern'], 0)
+        self.assertEqual(stats.seconds['cache'], 0)
+        self.assertAlmostEqual(sum(stats.hit_rates().values()), 1.0)
+        self.assertEqual(stats.hit_rates()['exact'], 1 / 6)
+
+    def test_report_and_snapshot(self):
+        stats = self.t.enable_stats()
+        self.t.transliterate(TEXT)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['wins'], stats.wins)
+        self.assertEqual(snapshot['histogram_bounds_us'], LATENCY_BUCKETS_US)
+        lines = stats.report().splitlines()
+        self.assertEqual(len(lines), len(STAGES) + 1)
+        self.assertEqual([line.split()[:2] for line in lines[1:]],
+                         [[stage, str(stats.wins[stage])] for stage in STAGES])
+        self.assertEqual(stats.percentile('pattern', 0.5), 0)
+        stats.reset()
+        self.assertEqual(sum(stats.wins.values()), 0)
+
+    def test_disabled(self):
+        stats = self.t.enable_stats()
+        self.t.disable_stats()
+        self.assertIsNone(self.t.stats)
+        self.t.transliterate(TEXT)
+        self.assertEqual(sum(stats.wins.values()), 0)
+
+    def test_user_stage(self):
+        stats = self.t.enable_stats()
+        # A word no other test uses: learns cannot be undone
+        self.t.learn('zqxw', 'জকিউ')
+        self.t.transliterate('zqxw')
+        self.assertEqual(stats.wins['user'], 1)
+        self.assertEqual(self.t.explain('zqxw')[0]['stage'], 'user')
+
+
+class TestExplain(unittest.TestCase):
+    def setUp(self):
+        self.t = Transliterator()
+
+    def test_stages(self):
+        steps = self.t.explain(TEXT)
+        self.assertEqual(''.join(step['output'] for step in steps), self.t.transliterate(TEXT))
+        words = [step for step in steps if step['normalized'] is not None]
+        self.assertEqual([(step['token'], step['stage']) for step in words],
+                         list(WORDS.items()) + [('ami', 'exact')])
+        for step in steps:
+            self.assertGreaterEqual(step['ms'], 0)
+            if step['normalized'] is None:
+                self.assertEqual(step['stage'], 'phonetic')
+
+    def test_bypasses_the_cache(self):
+        self.t.transliterate(TEXT)
+        stats = self.t.enable_stats()
+        hits, misses = self.t.cache_hits, self.t.cache_misses
+        self.assertEqual(self.t.explain('ami')[0]['stage'], 'exact')
+        self.assertEqual((self.t.cache_hits, self.t.cache_misses), (hits, misses))
+        self.assertEqual(sum(stats.wins.values()), 0)
+        self.t.disable_stats()
+
+    def test_normalized(self):
+        step = self.t.explain('AMI')[0]
+        self.assertEqual((step['token'], step['normalized'], step['output']), ('AMI', 'ami', 'আমি'))
+
+
+if __name__ == '__main__':
+    unittest.main()
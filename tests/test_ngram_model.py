@@ -0,0 +1,103 @@
+"""
+The learned n-gram model: pruning keeps its predictions, and the context
+store merges it on the writer thread without losing what is learned
+meanwhile.
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from core.engine.ngram_model import ID_BITS, NgramModel
+from core.engine.context_engine import ContextStore
+
+
+def sentence_words(count, seed):
+    """Words of a made-up text: 50 common words between rare ones."""
+    rng = random.Random(seed)
+    return [f'w{rng.randrange(50)}' if i % 3 else f'r{i}' for i in range(count)]
+
+
+def observe_all(model, words, start):
+    prev_prev = prev = None
+    for i, word in enumerate(words):
+        model.observe(prev_prev, prev, word, start + i)
+        prev_prev, prev = prev, word
+
+
+class TestNgramModel(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_save_prunes_unreferenced_words(self):
+        model = NgramModel()
+        model.MAX_BIGRAMS = model.MAX_TRIGRAMS = 100
+        observe_all(model, sentence_words(3000, 1), model.epoch)
+        model.merge()
+        # Contexts the capped bigrams kept, and one that lost its bigrams
+        contexts = sorted({(None, model.words[key >> ID_BITS]) for key in model.bigrams.keys})[:10]
+        contexts.append((None, 'r3'))
+        before = {context: model.predict(*context, limit=5) for context in contexts}
+
+        path = os.path.join(self.dir, 'context.model')
+        words = len(model.words)
+        with open(path, 'wb') as f:
+            f.write(model.save())
+        self.assertLess(len(model.words), words)
+        self.assertLessEqual(len(model.bigrams.keys), 100)
+        self.assertEqual(list(model.bigrams.keys), sorted(model.bigrams.keys))
+        self.assertEqual(list(model.trigrams.keys), sorted(model.trigrams.keys))
+
+        loaded = NgramModel.load(path)
+        for context, predicted in before.items():
+            for pruned in (model, loaded):
+                self.assertEqual([word for word, _ in pruned.predict(*context, limit=5)],
+                                 [word for word, _ in predicted], context)
+
+    def test_observe_never_merges(self):
+        model = NgramModel()
+        observe_all(model, sentence_words(NgramModel.MERGE_AFTER + 100, 2), model.epoch)
+        self.assertEqual(len(model.bigrams.keys), 0)
+        self.assertGreaterEqual(model.unmerged(), NgramModel.MERGE_AFTER)
+
+
+class TestContextStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        # Flushes happen when the test calls flush(), not on the writer thread
+        patcher = mock.patch.object(ContextStore, 'FLUSH_DELAY', 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_flush_merges_and_keeps_pending(self):
+        store = ContextStore(self.dir)
+        words = sentence_words(NgramModel.MERGE_AFTER, 3)
+        prev_prev = prev = None
+        for word in words:
+            store.learn(prev_prev, prev, word)
+            prev_prev, prev = prev, word
+        store.flush()
+        self.assertEqual(store.model.unmerged(), 0)
+
+        # Learned while the writer compacts: not in the files yet
+        store.learn(prev_prev, prev, 'late')
+        store._compact_locked()
+        self.assertIn('late', dict(store.model.predict(prev_prev, prev)))
+
+        store.flush()
+        reloaded = ContextStore(self.dir)
+        self.assertEqual([word for word, _ in reloaded.model.predict(None, 'w1', limit=5)],
+                         [word for word, _ in store.model.predict(None, 'w1', limit=5)])
+        self.assertIn('late', dict(reloaded.model.predict(prev_prev, prev)))
+
+
+if __name__ == '__main__':
+    unittest.main()
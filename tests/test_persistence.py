@@ -0,0 +1,37 @@
+"""
+Journal appends shared by the user dictionary and the context store.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.engine.persistence import append_journal
+
+
+class TestAppendJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'test.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def test_appends(self):
+        self.assertEqual(append_journal(self.path, b'["a"]\n'), (0, 6))
+        self.assertEqual(append_journal(self.path, b'["b"]\n'), (6, 12))
+        self.assertEqual(self.read(), b'["a"]\n["b"]\n')
+
+    def test_ends_a_partial_line(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'["a"]\n["b')  # A writer crashed mid-line
+        self.assertEqual(append_journal(self.path, b'["c"]\n'), (9, 16))
+        self.assertEqual(self.read().split(b'\n'), [b'["a"]', b'["b', b'["c"]', b''])
+
+
+if __name__ == '__main__':
+    unittest.main()
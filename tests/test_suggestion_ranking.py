@@ -0,0 +1,150 @@
+"""
+Suggestion ranking against brute force: PrefixIndex.top_k and the
+Suggester's best-first trie walk must return exactly the top words that
+scoring every candidate and sorting would.
+"""
+import bisect
+import itertools
+import json
+import os
+import random
+import unittest
+
+from tests import support
+from core.engine.prefix_index import PrefixIndex
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestPrefixIndexTopK(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.rng = rng
+        words = [''.join(rng.choice('abcd') for _ in range(rng.randint(1, 6))) for _ in range(3000)]
+        self.scores = [rng.randint(0, 200) for _ in words]
+        self.index = PrefixIndex(words, self.scores)
+        self.keys = self.index.keys
+
+    def brute_force(self, ranges, k, exclude):
+        best = {}
+        for lo, hi, bonus in ranges:
+            for i in range(lo, hi):
+                key = self.keys[i] + (bonus << PrefixIndex.POS_BITS)
+                if key > best.get(i, -1):
+                    best[i] = key
+        ranked = sorted([i for i in best if i not in exclude], key=best.__getitem__, reverse=True)
+        return ranked[:k]
+
+    def random_ranges(self):
+        ranges = []
+        for _ in range(self.rng.randint(1, 6)):
+            prefix = ''.join(self.rng.choice('abcd') for _ in range(self.rng.randint(0, 3)))
+            lo, hi = self.index.prefix_range(prefix)
+            ranges.append((lo, hi, self.rng.randint(0, 100)))
+        return ranges
+
+    def test_matches_brute_force(self):
+        for _ in range(500):
+            ranges = self.random_ranges()
+            exclude = set(self.rng.sample(range(len(self.index)), 50))
+            k = self.rng.randint(1, 10)
+            expected = self.brute_force(ranges, k, exclude)
+            got = self.index.top_k([(lo, hi, bonus, None) for lo, hi, bonus in ranges], k, exclude)
+            self.assertEqual(got, expected)
+
+    def test_lazy_nodes(self):
+        # Each range hidden behind a node bounded by its bonus
+        for _ in range(200):
+            ranges = self.random_ranges()
+            nodes = [(0, len(self.index), bonus, (lo, hi, bonus)) for lo, hi, bonus in ranges]
+            got = self.index.top_k(nodes, 5, expand=lambda state, lo, hi: [state + (None,)])
+            self.assertEqual(got, self.brute_force(ranges, 5, ()))
+
+
+class TestSuggesterTopK(unittest.TestCase):
+    # Inputs whose transliteration has more ambiguous spellings are skipped
+    MAX_SPELLINGS = 2000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.t = Transliterator()
+        cls.suggester = cls.t.suggester
+
+        # The pool in dictionary-file order, the tie-break of equal scores
+        with open(os.path.join(cls.t.data_dir, 'openbangla_dictionary.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        cls.pool_order = {}
+        for words in data.values():
+            for word in words:
+                cls.pool_order.setdefault(word, len(cls.pool_order))
+        cls.sorted_pool = sorted(cls.pool_order)
+
+        golden = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'golden.json')
+        with open(golden, 'r', encoding='utf-8') as f:
+            cls.inputs = list(json.load(f)['suggestions'])[::3]
+
+    def brute_force(self, target):
+        """Scores every pool word under every ambiguous spelling of `target`."""
+        suggester = self.suggester
+        options = [[unit] + suggester.AMBIGUOUS.get(unit, []) for unit in suggester._units(target)]
+        spellings = {''.join(parts) for parts in itertools.product(*options)}
+        if len(spellings) > self.MAX_SPELLINGS:
+            return None
+        best = {}
+        pool = self.sorted_pool
+        for spelling in spellings:
+            i = bisect.bisect_left(pool, spelling)
+            while i < len(pool) and pool[i].startswith(spelling):
+                word = pool[i]
+                i += 1
+                if word == spelling or word == target:
+                    continue
+                score = suggester._score_word(word, spelling == target)
+                best[word] = max(best.get(word, score), score)
+        ranked = sorted(best, key=lambda word: (-best[word], self.pool_order[word]))
+        return ranked[:suggester.MAX_SUGGESTIONS]
+
+    def assertMatchesBruteForce(self):
+        checked = 0
+        for text in self.inputs:
+            word = self.t._last_word(text)
+            if not word:
+                continue
+            target = self.t.transliterate(word)
+            got = self.suggester.get_suggestions(word, target)
+            expected = self.brute_force(target)
+            if expected is None:
+                continue
+            self.assertEqual(got, expected, f"{text!r} -> {target}")
+            checked += 1
+        self.assertGreater(checked, len(self.inputs) // 2)
+
+    def test_without_context(self):
+        self.t.context_engine.clear_context()
+        self.assertMatchesBruteForce()
+
+    def test_with_context(self):
+        for previous in ['আমি', 'নদীর']:
+            with self.subTest(previous=previous):
+                self.t.context_engine.clear_context()
+                self.t.context_engine.set_context(previous)
+                self.assertMatchesBruteForce()
+        self.t.context_engine.clear_context()
+
+    def test_with_usage_boosts(self):
+        for word in ['আমার', 'আমরা', 'করতে', 'বাংলা', 'দেশ']:
+            self.t.user_dictionary.record_use(word)
+        self.assertMatchesBruteForce()
+
+
+if __name__ == '__main__':
+    unittest.main()
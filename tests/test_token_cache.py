@@ -0,0 +1,72 @@
+"""
+The token cache: repeated words are served from it and counted as hits,
+and a learned word or a reload never leaves a stale reading behind.
+"""
+import unittest
+
+from tests import support
+from core.engine.transliterator import EngineData, Transliterator
+
+home = support.IsolatedHome()
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.t = Transliterator()
+        self.t.token_cache.clear()
+
+    def test_hits_and_misses(self):
+        self.assertEqual(self.t.transliterate('ami ami tumi, ami'), 'আমি আমি তুমি, আমি')
+        self.assertEqual((self.t.cache_hits, self.t.cache_misses), (2, 2))
+        self.assertEqual(list(self.t.token_cache), ['tumi', 'ami'])
+        stats = self.t.enable_stats()
+        self.t.transliterate('tumi')
+        self.assertEqual(stats.wins['cache'], 1)
+        self.assertEqual((self.t.cache_hits, self.t.cache_misses), (3, 2))
+
+    def test_least_recently_used_is_evicted(self):
+        self.t.TOKEN_CACHE_SIZE = 2
+        self.t.transliterate('ami tumi ami se')
+        self.assertEqual(list(self.t.token_cache), ['ami', 'se'])
+        self.t.transliterate('tumi')
+        self.assertEqual(self.t.cache_misses, 4)
+
+    def test_learn_drops_the_word(self):
+        other = Transliterator()
+        self.t.transliterate('ami tumi')
+        self.t.learn('ami', 'আমিই')
+        self.assertEqual(list(self.t.token_cache), ['tumi'])
+        self.assertEqual(self.t.transliterate('ami tumi'), 'আমিই তুমি')
+        # Engines of the process share the cache and the user dictionary
+        self.assertEqual(other.transliterate('Ami'), 'আমিই')
+        self.t.learn('ami', 'আমি')
+        self.assertEqual(other.transliterate('ami'), 'আমি')
+
+    def test_reload_starts_an_empty_cache(self):
+        self.t.transliterate('ami tumi')
+        previous = self.t.engine_data
+        self.t.reload()
+        self.assertIsNot(self.t.engine_data, previous)
+        self.assertIs(self.t.token_cache, self.t.engine_data.token_cache)
+        self.assertEqual(len(self.t.token_cache), 0)
+        self.assertEqual(self.t.transliterate('tumi'), 'তুমি')
+        self.assertEqual(self.t.cache_hits, 0)
+        # A learn still reaches the cache of the data loaded before
+        previous_words = list(previous.token_cache)
+        self.t.learn('tumi', 'তুমিই')
+        self.assertEqual(list(previous.token_cache), [w for w in previous_words if w != 'tumi'])
+        self.assertNotIn('tumi', self.t.token_cache)
+        self.assertIs(EngineData.get(self.t.data_dir), self.t.engine_data)
+        self.t.learn('tumi', 'তুমি')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Keystroke sessions: every frame equals composing its buffer from scratch,
+and Backspace restores the earlier frames, suffix merges included.
+"""
+import unittest
+
+from tests import support
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestTypingSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.t = Transliterator()
+
+    def setUp(self):
+        self.t.context_engine.clear_context()
+        self.session = self.t.start_session()
+
+    def assertComposes(self, buffer):
+        expected = self.t.compose(buffer)
+        self.assertEqual(self.session.buffer, buffer)
+        self.assertEqual(self.session.preedit, expected.preedit, buffer)
+        self.assertEqual(self.session.suggestions, expected.suggestions, buffer)
+        self.assertEqual(self.session.composition.spans, expected.spans, buffer)
+
+    def type(self, text):
+        frames = []
+        for char in text:
+            self.session.append(char)
+            self.assertComposes(self.session.buffer)
+            frames.append(self.session.composition)
+        return frames
+
+    def test_backspace_restores_frames(self):
+        frames = self.type('amar bari')
+        for frame in reversed(frames[:-1]):
+            self.session.backspace()
+            self.assertIs(self.session.composition, frame)
+            self.assertEqual(self.session.suggestion_session.stack[-1][1], frame.suggestions)
+        self.session.backspace()
+        self.assertEqual((self.session.buffer, self.session.preedit, self.session.suggestions), ('', '', []))
+        self.session.backspace()  # Nothing left to remove
+        self.assertEqual(self.session.buffer, '')
+
+    def test_backspace_undoes_a_suffix_merge(self):
+        # "mon e" merges into one word; removing the "e" splits it again
+        self.type('mon e')
+        self.assertEqual(self.session.preedit, 'মনে')
+        self.session.backspace()
+        self.assertComposes('mon ')
+        self.assertEqual(self.session.preedit, 'মন ')
+        self.type('e')
+        self.assertComposes('mon e')
+        self.type(' ')
+        self.session.backspace()
+        self.session.backspace()
+        self.assertComposes('mon ')
+
+    def test_backspace_into_a_pasted_frame(self):
+        # A frame appended with several characters is rebuilt, not restored
+        self.session.append('kajta')
+        self.session.append(' k')
+        self.assertComposes('kajta k')
+        self.session.backspace()
+        self.assertComposes('kajta ')
+        self.session.backspace()
+        self.session.backspace()
+        self.assertComposes('kajt')
+        self.assertEqual(len(self.session.frames), len(self.session.suggestion_session.stack))
+
+    def test_reset(self):
+        self.type('ami')
+        self.session.reset()
+        self.assertEqual(self.session.frames, [])
+        self.assertEqual(self.session.suggestion_session.stack, [])
+        self.type('tumi')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+The personal usage model: counts halve every HALF_LIFE, and a full model
+evicts its least used eighth, which Suggester's boosts must follow.
+"""
+import time
+import unittest
+
+from tests import support
+from core.engine.usage_model import UsageModel
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+DAY = 24 * 3600
+NOW = 1_700_000_000.0
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+class TestDecay(unittest.TestCase):
+    def test_half_life(self):
+        model = UsageModel()
+        for _ in range(4):
+            model.record('আমি', NOW)
+        self.assertEqual(model.entries['আমি'], [4.0, NOW])
+        self.assertEqual(model.boost('আমি', NOW), 60)  # 4 * 15, the cap
+        self.assertEqual(model.boost('আমি', NOW + model.HALF_LIFE), 30)
+        self.assertEqual(model.boost('আমি', NOW + 2 * model.HALF_LIFE), 15)
+        # A use adds 1 to the decayed count
+        model.record('আমি', NOW + model.HALF_LIFE)
+        self.assertEqual(model.entries['আমি'], [3.0, NOW + model.HALF_LIFE])
+
+    def test_cap_and_unknown_words(self):
+        model = UsageModel()
+        for _ in range(10):
+            model.record('তুমি', NOW)
+        self.assertEqual(model.boost('তুমি', NOW), model.MAX_BOOST)
+        self.assertEqual(model.boost('সে', NOW), 0)
+        # A clock running backwards does not grow the count
+        self.assertEqual(model.boost('তুমি', NOW - DAY), model.MAX_BOOST)
+
+    def test_boosts_skip_faded_words(self):
+        model = UsageModel()
+        model.record('আমি', NOW - 10 * model.HALF_LIFE)
+        model.record('তুমি', NOW)
+        self.assertEqual(model.boosts(NOW), {'তুমি': 15})
+
+    def test_changes(self):
+        model = UsageModel()
+        model.record('আমি', NOW)
+        model.record('তুমি', NOW)
+        model.record('আমি', NOW)
+        self.assertEqual(model.version, 3)
+        self.assertEqual(list(model.changes), [(1, 'আমি'), (2, 'তুমি'), (3, 'আমি')])
+        for i in range(model.CHANGE_LOG):
+            model.record(f'w{i}', NOW)
+        self.assertEqual(len(model.changes), model.CHANGE_LOG)
+        self.assertEqual(model.changes[-1], (model.version, f'w{model.CHANGE_LOG - 1}'))
+
+
+class TestEviction(unittest.TestCase):
+    def full_model(self):
+        model = UsageModel()
+        model.MAX_WORDS = 16
+        # w0 used longest ago, w15 most recently
+        for i in range(16):
+            model.record(f'w{i}', NOW - (16 - i) * DAY)
+        model.record('w0', NOW)  # Rescued by a recent use
+        return model
+
+    def test_evicts_the_least_used_eighth(self):
+        model = self.full_model()
+        self.assertEqual(model.evicted_at, 0)
+        model.record('new', NOW)
+        self.assertEqual(len(model.entries), 16 - 2 + 1)
+        self.assertNotIn('w1', model.entries)
+        self.assertNotIn('w2', model.entries)
+        self.assertIn('w0', model.entries)
+        self.assertEqual(model.evicted_at, model.version)
+
+    def test_known_words_do_not_evict(self):
+        model = self.full_model()
+        model.record('w5', NOW)
+        self.assertEqual(len(model.entries), 16)
+        self.assertEqual(model.evicted_at, 0)
+
+    def test_evicts_one_of_a_small_model(self):
+        model = UsageModel()
+        model.MAX_WORDS = 3
+        for i, word in enumerate(['আমি', 'তুমি', 'সে', 'আমরা']):
+            model.record(word, NOW + i)
+        self.assertEqual(sorted(model.entries), sorted(['তুমি', 'সে', 'আমরা']))
+
+
+class TestSuggesterBoosts(unittest.TestCase):
+    def test_follow_eviction(self):
+        t = Transliterator()
+        model = UsageModel()
+        model.MAX_WORDS = 4
+        t.suggester.set_usage_model(model)
+        # Suggester ranks at the current time
+        now = time.time()
+        words = ['আমি', 'আমার', 'আমরা', 'আমাদের']
+        for i, word in enumerate(words):
+            model.record(word, now - len(words) + i)
+            t.get_suggestions('am')
+        self.assertEqual(set(t.suggester.usage_scores), set(words))
+        # Patched in one at a time, then rebuilt after the eviction
+        model.record('আমাকে')
+        t.get_suggestions('am')
+        self.assertEqual(set(t.suggester.usage_scores), set(words[1:] + ['আমাকে']))
+        self.assertEqual(set(t.suggester.usage_scores), set(model.entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
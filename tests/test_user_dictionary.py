@@ -0,0 +1,94 @@
+"""
+The user dictionary shared between processes and between the engines of
+one process: no learned word may be lost, and every engine must see it.
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+from tests import support
+from core.engine.user_dictionary import UserDictionary
+from core.engine.transliterator import Transliterator
+
+home = support.IsolatedHome()
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Learns `count` words tagged with process number `n`, flushing and
+# compacting often so appends and compactions of the processes interleave
+LEARNER = """
+import sys
+from core.engine.user_dictionary import UserDictionary
+n, count = int(sys.argv[1]), int(sys.argv[2])
+user_dictionary = UserDictionary()
+user_dictionary.COMPACT_AFTER = 37
+for i in range(count):
+    user_dictionary.learn(f'p{n}w{i}', f'ব{n}-{i}')
+    if i % 7 == 0:
+        user_dictionary.flush()
+    if i % 13 == 0:
+        user_dictionary.sync()
+user_dictionary.flush()
+"""
+
+
+def setUpModule():
+    home.start()
+
+
+def tearDownModule():
+    home.stop()
+
+
+def run_learners(processes, count):
+    """Runs the learners concurrently, each a separate interpreter."""
+    children = [subprocess.Popen([sys.executable, '-c', LEARNER, str(n), str(count)], cwd=project_root)
+                for n in range(processes)]
+    for child in children:
+        child.wait()
+    return [child.returncode for child in children]
+
+
+class TestProcesses(unittest.TestCase):
+    PROCESSES = 4
+    WORDS = 150
+
+    def test_concurrent_learns_all_survive(self):
+        watcher = UserDictionary()
+        watcher.SYNC_INTERVAL = 0
+        self.assertEqual(run_learners(self.PROCESSES, self.WORDS), [0] * self.PROCESSES)
+
+        loaded = UserDictionary()
+        watcher.sync()
+        for user_dictionary in (loaded, watcher):
+            missing = [(n, i) for n in range(self.PROCESSES) for i in range(self.WORDS)
+                       if user_dictionary.lookup(f'p{n}w{i}') != f'ব{n}-{i}']
+            self.assertEqual(missing, [])
+
+
+class TestEngines(unittest.TestCase):
+    def test_learn_reaches_engine_on_previous_data(self):
+        a = Transliterator()
+        b = Transliterator()
+        self.assertEqual(a.transliterate('ami'), 'আমি')
+        b.reload()
+        b.learn('ami', 'আমিই')
+        self.assertEqual(a.transliterate('ami'), 'আমিই')
+        self.assertEqual(b.transliterate('ami'), 'আমিই')
+
+    def test_learn_in_another_process(self):
+        a = Transliterator()
+        a.user_dictionary.SYNC_INTERVAL = 0
+        self.assertEqual(a.transliterate('kobe'), 'কবে')
+        code = "from core.engine.transliterator import Transliterator\n" \
+               "t = Transliterator()\n" \
+               "t.learn('kobe', 'কবেই')\n" \
+               "t.user_dictionary.flush()\n"
+        subprocess.run([sys.executable, '-c', code], cwd=project_root, check=True)
+        self.assertEqual(a.transliterate('kobe'), 'কবেই')
+        self.assertEqual(Transliterator().transliterate('kobe'), 'কবেই')
+
+
+if __name__ == '__main__':
+    unittest.main()
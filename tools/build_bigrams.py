@@ -0,0 +1,207 @@
+"""
+Builds the corpus bigram model (data/bigrams.bin) that ContextEngine uses
+to rank the next word, in place of its small hand-written table.
+
+Streams Bengali text (plain, .gz or .bz2 files; '-' for stdin) line by
+line and counts adjacent word pairs, and how often each word starts and
+ends a pair. Pairs never span punctuation, digits or non-Bengali text.
+Memory is bounded: when the pair table holds --max-pairs pairs, pairs
+below a rising count floor are dropped (lossy counting), so rare pairs
+are lost and kept ones are low by at most the floor. The per-word counts
+are bounded by --max-words the same way.
+
+Then pairs seen fewer than --min-count times, or with a pointwise mutual
+information below --min-pmi bits (they co-occur little more than chance
+would have them), are pruned. PMI compares a pair's count with the
+counts of its words as the first and the second word of a pair, all
+over the pairs counted: tokens at line and punctuation boundaries have
+no pair, so per-token counts would bias it. Each word keeps its --top
+most probable next words, with P(next | word) quantized to one byte.
+
+Usage: python3 tools/build_bigrams.py corpus.txt [more...] [-o data/bigrams.bin]
+           [--min-count 5] [--min-pmi 1.0] [--top 32]
+           [--max-pairs 2000000] [--max-words 500000] [--sweep]
+"""
+import argparse
+import bz2
+import gzip
+import math
+import os
+import re
+import sys
+import time
+
+# Add project root to path (tools/ -> root)
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, base_dir)
+
+from core.engine.corpus_bigrams import MODEL_NAME, write_model
+
+# A word: a run of Bengali letters and signs (not digits) and joiners. Any
+# other character (punctuation, dandas, digits, Latin) matches as an empty
+# word and ends the run of adjacent words.
+_TOKEN = re.compile(r'([\u0980-\u09e5\u09f0-\u09ff\u200c\u200d]+)|\S')
+
+# Thresholds listed by --sweep
+SWEEP_COUNTS = (2, 3, 5, 10, 20, 50)
+SWEEP_PMIS = (0.0, 1.0, 2.0, 3.0, 4.0)
+
+
+class BoundedCounts:
+    """
+    Counts keys in at most `limit` entries (lossy counting): when full,
+    keys counted no more than a rising floor are dropped until at most
+    half the limit remains.
+    """
+    def __init__(self, limit):
+        self.counts = {}
+        self.limit = limit
+        self.floor = 0
+
+    def prune(self):
+        counts = self.counts
+        while len(counts) > self.limit // 2:
+            self.floor += 1
+            counts = {key: n for key, n in counts.items() if n > self.floor}
+        self.counts = counts
+
+
+def open_corpus(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def count_corpus(paths, max_words, max_pairs):
+    """
+    Streams the corpora; returns (first-word counts, second-word counts,
+    pair counts, tokens, pairs).
+    """
+    lefts = BoundedCounts(max_words)
+    rights = BoundedCounts(max_words)
+    pairs = BoundedCounts(max_pairs)
+    intern = sys.intern
+    tokens = total_pairs = 0
+    for path in paths:
+        with open_corpus(path) as f:
+            for line in f:
+                left_counts, right_counts, pair_counts = lefts.counts, rights.counts, pairs.counts
+                prev = None
+                for token in _TOKEN.findall(line):
+                    if not token:
+                        prev = None
+                        continue
+                    token = intern(token)
+                    tokens += 1
+                    if prev is not None:
+                        total_pairs += 1
+                        left_counts[prev] = left_counts.get(prev, 0) + 1
+                        right_counts[token] = right_counts.get(token, 0) + 1
+                        pair = (prev, token)
+                        pair_counts[pair] = pair_counts.get(pair, 0) + 1
+                    prev = token
+                for counts in (lefts, rights, pairs):
+                    if len(counts.counts) > counts.limit:
+                        counts.prune()
+    return lefts, rights, pairs, tokens, total_pairs
+
+
+def score_pairs(left_counts, right_counts, pair_counts, total_pairs, min_count):
+    """
+    (word, next, count, pmi, P(next | word)) for pairs of both known words.
+    The marginals are over pairs: a word's count as the first word of a
+    pair, and as the second.
+    """
+    for (word, next_word), n in pair_counts.items():
+        if n < min_count:
+            continue
+        left_n, right_n = left_counts.get(word), right_counts.get(next_word)
+        if not left_n or not right_n:
+            continue  # A word pruned by the bounded counting
+        pmi = math.log2(n * total_pairs / (left_n * right_n))
+        yield word, next_word, n, pmi, min(1.0, n / left_n)
+
+
+def select(scored, min_pmi, top):
+    """word -> its `top` most probable next words with PMI >= min_pmi."""
+    successors = {}
+    for word, next_word, n, pmi, probability in scored:
+        if pmi >= min_pmi:
+            successors.setdefault(word, []).append((next_word, probability))
+    for word, pairs in successors.items():
+        pairs.sort(key=lambda pair: pair[1], reverse=True)
+        del pairs[top:]
+    return successors
+
+
+def print_sweep(scored):
+    """Pairs kept (before --top) for a grid of thresholds."""
+    print(f"\nPairs kept by --min-count (rows) and --min-pmi (columns), before --top:")
+    print(f"{'':>8}" + ''.join([f"{pmi:>10.1f}" for pmi in SWEEP_PMIS]))
+    for min_count in SWEEP_COUNTS:
+        row = [0] * len(SWEEP_PMIS)
+        for _, _, n, pmi, _ in scored:
+            if n >= min_count:
+                for i, min_pmi in enumerate(SWEEP_PMIS):
+                    if pmi >= min_pmi:
+                        row[i] += 1
+        print(f"{min_count:>8}" + ''.join([f"{kept:>10}" for kept in row]))
+    print("A kept pair costs about 5 bytes, plus each distinct word once.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the corpus bigram model for the context engine.")
+    parser.add_argument('corpora', nargs='+', help="Bengali text files (.gz/.bz2 ok, '-' for stdin)")
+    parser.add_argument('-o', '--output', default=os.path.join(base_dir, 'data', MODEL_NAME),
+                        help=f"Model path (default: data/{MODEL_NAME})")
+    parser.add_argument('--min-count', type=int, default=5, help="Fewest occurrences of a kept pair (default: 5)")
+    parser.add_argument('--min-pmi', type=float, default=1.0, help="Lowest PMI of a kept pair, in bits (default: 1.0)")
+    parser.add_argument('--top', type=int, default=32, help="Next words kept per word (default: 32)")
+    parser.add_argument('--max-words', type=int, default=500000, help="Word counting memory bound (default: 500000)")
+    parser.add_argument('--max-pairs', type=int, default=2000000, help="Pair counting memory bound (default: 2000000)")
+    parser.add_argument('--sweep', action='store_true', help="Also list pairs kept for a grid of thresholds")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print(f"Counting {', '.join(args.corpora)}...")
+    start = time.time()
+    lefts, rights, pairs, tokens, total_pairs = count_corpus(args.corpora, args.max_words, args.max_pairs)
+    counted = time.time() - start
+    print(f"{tokens} words, {total_pairs} pairs, {len(pairs.counts)} distinct pairs "
+          f"in {counted:.1f}s ({tokens / max(counted, 1e-9) / 1e6:.2f}M words/s)")
+    word_floor = max(lefts.floor, rights.floor)
+    if word_floor or pairs.floor:
+        print(f"Memory bound reached: dropped words seen <= {word_floor} times, pairs seen <= {pairs.floor} times")
+
+    min_count = min(args.min_count, SWEEP_COUNTS[0]) if args.sweep else args.min_count
+    scored = list(score_pairs(lefts.counts, rights.counts, pairs.counts, total_pairs, min_count))
+    if args.sweep:
+        print_sweep(scored)
+    successors = select([s for s in scored if s[2] >= args.min_count], args.min_pmi, args.top)
+    kept = sum(len(p) for p in successors.values())
+
+    meta = {
+        'tokens': tokens,
+        'pairs': total_pairs,
+        'min_count': args.min_count,
+        'min_pmi': args.min_pmi,
+        'top': args.top,
+        'count_floor': pairs.floor,
+    }
+    write_model(args.output, successors, meta)
+    elapsed = time.time() - start
+
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"\nKept {kept} pairs after {len(successors)} words "
+          f"(--min-count {args.min_count}, --min-pmi {args.min_pmi}, --top {args.top})")
+    print(f"Wrote {args.output} ({size_kb:.0f} KB) in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+import sys
+import time
+
+# Add project root to path (tools/ -> root)
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, base_dir)
+
+from core.engine.binary_data import compile_data, ARTIFACT_NAME, FORMAT_VERSION
+
+def main():
+    data_dir = os.path.join(base_dir, 'data')
+    out_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_dir, ARTIFACT_NAME)
+
+    print(f"Compiling {data_dir} (format v{FORMAT_VERSION})...")
+    start = time.time()
+    compile_data(data_dir, out_path)
+    elapsed = time.time() - start
+
+    size_mb = os.path.getsize(out_path) / (1024 * 1024)
+    print(f"Wrote {out_path} ({size_mb:.1f} MB) in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()